@@ -1,75 +1,131 @@
-from flask import Flask, render_template, request, redirect, url_for
-from grammarchecker import PersianGrammarChecker
-from hazm_methods import SentenceTokenizer
-from hazm import Normalizer
+from flask import Flask, Response, render_template, request, redirect, url_for, jsonify, stream_with_context
+from engine import get_engine, WARMUP_SENTENCES
+from hazm_methods import SentenceTokenizer, current_rss
+from logwriter import get_log_writer
+from metrics import METRICS, DOCUMENT_SECONDS, ERRORS
+from document import Document
+from scheduler import BatchScheduler
+from incremental import IncrementalChecker
+from jobs import JobStore, JobQueue, job_progress
+from memory import get_memory_budget
+from pipeline import iter_lines, iter_sentences, split_ahead, stream_corrections
+import atexit
+import io
 import json
-import concurrent.futures
+import os
+import sys
+import threading
+import time
 
 app = Flask(__name__)
+# Limits for the JSON API (request body size and number of texts)
+app.config['API_MAX_BYTES'] = int(os.environ.get('GEC_API_MAX_BYTES', 1024 * 1024))
+app.config['API_MAX_TEXTS'] = int(os.environ.get('GEC_API_MAX_TEXTS', 1000))
+# Streamed uploads: sentences per engine batch, batches corrected at once and
+# split sentences queued ahead of correction
+app.config['STREAM_BATCH_SIZE'] = int(os.environ.get('GEC_STREAM_BATCH_SIZE', 64))
+app.config['STREAM_MAX_IN_FLIGHT'] = int(os.environ.get('GEC_STREAM_MAX_IN_FLIGHT', 0)) or None
+app.config['STREAM_QUEUE_SIZE'] = int(os.environ.get('GEC_STREAM_QUEUE_SIZE', 1024))
+# Largest document accepted by /api/jobs
+app.config['JOB_MAX_BYTES'] = int(os.environ.get('GEC_JOB_MAX_BYTES', 64 * 1024 * 1024))
 
 # Initialize components
-normalizer = Normalizer()
-grammar_checker = PersianGrammarChecker()
+engine = get_engine()
+# Gathers sentences from concurrent requests into shared engine batches
+scheduler = BatchScheduler(
+    engine,
+    max_wait=float(os.environ.get('GEC_BATCH_WAIT_MS', 5)) / 1000,
+    max_batch=int(os.environ.get('GEC_MAX_BATCH', 256)),
+    normalized=True,
+)
 sentence_tokenizer = SentenceTokenizer()
+# Reuses the results of lines seen before, so a resubmitted text only
+# costs as much as its edited lines
+# Large re-checks split ahead of correction when the engine has worker processes
+incremental = IncrementalChecker(scheduler.correct, sentence_tokenizer=sentence_tokenizer,
+                                 overlap_lines=64 if engine.workers > 1 else None)
+log_writer = get_log_writer("log.json")
+# Background jobs for large documents, kept in SQLite across restarts
+jobs = JobQueue(
+    JobStore(os.environ.get('GEC_JOB_DB', 'jobs.sqlite3')),
+    engine,
+    workers=int(os.environ.get('GEC_JOB_WORKERS', 2)),
+)
+# atexit runs hooks last-registered first, so running jobs are handed back
+# before the engine they correct on is shut down
+atexit.register(jobs.close)
 
+METRICS.gauge('gec_scheduler_queued_requests', "Requests waiting for a batch",
+              lambda: scheduler.stats()['queued'])
+METRICS.gauge('gec_log_queued_entries', "Log entries waiting to be written",
+              lambda: log_writer.stats()['queued'])
+
+# Caches, models and documents in process_text, under GEC_MEMORY_BUDGET if set
+memory = get_memory_budget()
+memory.add_cache('lines', incremental.lines)
+METRICS.gauge('gec_memory_rss_bytes', "Resident memory of this process", current_rss)
+METRICS.gauge('gec_memory_cache_bytes', "Approximate bytes held by this process's caches",
+              lambda: memory.report()['cache_bytes'])
+
+# Set once warm-up has finished; /ready answers 503 until then
+ready = threading.Event()
+
+
+def split_sentences(text: str) -> list[str]:
+    """Normalize each line of text and split it into non-empty sentences"""
+    return Document.from_text(text, sentence_tokenizer).texts
 
-def process_sentence(sentence: str) -> dict:
-    """
-    Process a single sentence through grammar checker.
-    Returns: dict with original and corrected sentence
-    """
-    corrected = grammar_checker.correct(sentence.strip())
-    return {
-        "original": sentence.strip(),
-        "corrected": corrected
-    }
 
 def process_text(text: str) -> tuple[str, list[dict]]:
     """
-    Process text through grammar checker using multithreading.
+    Process text through the correction engine. Lines checked before are
+    reused and only new or edited lines are corrected, but every sentence
+    of the submission is logged, as before incremental re-checking.
     Returns: (corrected_text, log_entries)
     """
     if not text or not text.strip():
         return '', []
     
-    # Collect all sentences into a list
-    all_sentences = []
-    for line in text.splitlines():
-        if not line.strip():
-            continue
-            
-        # Normalize the line
-        normalized_line = normalizer.normalize(line.strip())
-        
-        # Tokenize into sentences
-        sentences = sentence_tokenizer.tokenize(normalized_line)
-        
-        # Add non-empty sentences to the list
-        for sentence in sentences:
-            if sentence.strip():
-                all_sentences.append(sentence.strip())
-    
-    # Process sentences in parallel using ThreadPoolExecutor
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        log_entries = list(executor.map(process_sentence, all_sentences))
-    
-    # Extract corrected sentences from log entries
-    corrected_sentences = [entry["corrected"] for entry in log_entries]
-    
-    # Join corrected sentences with space
-    result = '\n'.join(corrected_sentences)
+    start = time.perf_counter()
+    try:
+        with memory.in_flight('process_text', sys.getsizeof(text)):
+            result = incremental.check(text)
+    except Exception:
+        ERRORS.labels('process_text').inc()
+        raise
+    log_entries = [
+        {"original": original, "corrected": corrected}
+        for original, corrected in result.sentence_pairs
+    ]
+
+    DOCUMENT_SECONDS.labels('split').observe(result.split_seconds)
+    DOCUMENT_SECONDS.labels('correct').observe(result.correct_seconds)
+    DOCUMENT_SECONDS.labels('total').observe(time.perf_counter() - start)
     
-    return result, log_entries
+    return result.corrected_text, log_entries
 
 
 def write_log(log_entries: list[dict]):
-    """Write log entries to log.json file"""
+    """Queue log entries for the background log.json writer"""
+    log_writer.write(log_entries)
+
+
+def warm_up():
+    """
+    Push a few sentences through the same path as a request, so the
+    normalizer, tokenizers, tagger (in the batch thread that will use it),
+    lemmatizer and conjugation are loaded before real traffic arrives
+    """
     try:
-        with open("log.json", "a", encoding="utf-8") as f:
-            for entry in log_entries:
-                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        scheduler.correct(split_sentences('\n'.join(WARMUP_SENTENCES)))
     except Exception as e:
-        print(f"Error writing to log file: {e}")
+        ERRORS.labels('warm_up').inc()
+        print(f"Warm-up failed: {e}")
+        return
+    ready.set()
+
+
+threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
 
 
 @app.route('/')
@@ -86,7 +142,7 @@ def process():
     if uploaded_file and uploaded_file.filename:
         # File upload takes precedence
         try:
-            input_text = uploaded_file.read().decode('utf-8')
+            input_text = '\n'.join(iter_lines(uploaded_file.stream))
             input_type = 'File Input'
         except Exception as e:
             return render_template(
@@ -117,5 +173,277 @@ def process():
     )
 
 
+@app.route('/api/correct', methods=['POST'])
+def api_correct():
+    """
+    JSON batch API. Body: a list of texts, or {"texts": [...]}.
+    Every text is split into sentences; all sentences are corrected in
+    one scheduled batch and returned per text with timings in milliseconds.
+    """
+    if request.content_length is None or request.content_length > app.config['API_MAX_BYTES']:
+        return jsonify(error=f"Payload must be at most {app.config['API_MAX_BYTES']} bytes "
+                             "with a Content-Length header"), 413
+
+    payload = request.get_json(silent=True)
+    texts = payload.get('texts') if isinstance(payload, dict) else payload
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return jsonify(error="Expected a JSON array of strings or {\"texts\": [...]}"), 400
+    if len(texts) > app.config['API_MAX_TEXTS']:
+        return jsonify(error=f"At most {app.config['API_MAX_TEXTS']} texts per request"), 413
+
+    start = time.perf_counter()
+    try:
+        per_text = [split_sentences(text) for text in texts]
+        split_done = time.perf_counter()
+
+        all_sentences = [sentence for sentences in per_text for sentence in sentences]
+        corrected_sentences = scheduler.correct(all_sentences)
+        correct_done = time.perf_counter()
+    except Exception:
+        ERRORS.labels('api_correct').inc()
+        raise
+
+    results = []
+    log_entries = []
+    offset = 0
+    for sentences in per_text:
+        corrected = corrected_sentences[offset:offset + len(sentences)]
+        offset += len(sentences)
+        pairs = [
+            {"original": original, "corrected": fixed}
+            for original, fixed in zip(sentences, corrected)
+        ]
+        log_entries.extend(pairs)
+        results.append({"sentences": pairs, "corrected": '\n'.join(corrected)})
+
+    write_log(log_entries)
+
+    return jsonify(
+        results=results,
+        timings={
+            "split_ms": (split_done - start) * 1000,
+            "correct_ms": (correct_done - split_done) * 1000,
+            "total_ms": (time.perf_counter() - start) * 1000,
+            "sentences": len(all_sentences),
+        },
+    )
+
+
+@app.route('/api/recheck', methods=['POST'])
+def api_recheck():
+    """
+    Incremental re-check. Body: {"text": "..."}. Every non-blank line is
+    hashed; lines checked before (by anyone) are answered from the line
+    cache and only new or edited lines are corrected. Each line comes back
+    with its hash, whether it was rechecked, and its sentence pairs.
+    """
+    if request.content_length is None or request.content_length > app.config['API_MAX_BYTES']:
+        return jsonify(error=f"Payload must be at most {app.config['API_MAX_BYTES']} bytes "
+                             "with a Content-Length header"), 413
+
+    payload = request.get_json(silent=True)
+    text = payload.get('text') if isinstance(payload, dict) else None
+    if not isinstance(text, str):
+        return jsonify(error="Expected {\"text\": \"...\"}"), 400
+
+    start = time.perf_counter()
+    try:
+        result = incremental.check(text)
+    except Exception:
+        ERRORS.labels('api_recheck').inc()
+        raise
+    write_log([
+        {"original": original, "corrected": corrected}
+        for original, corrected in result.rechecked_pairs
+    ])
+
+    rechecked = sum(line.rechecked for line in result.lines)
+    return jsonify(
+        lines=[
+            {
+                "hash": line.hash,
+                "rechecked": line.rechecked,
+                "sentences": [{"original": o, "corrected": c} for o, c in line.pairs],
+            }
+            for line in result.lines
+        ],
+        corrected=result.corrected_text,
+        stats={
+            "lines": len(result.lines),
+            "rechecked": rechecked,
+            "reused": len(result.lines) - rechecked,
+            "total_ms": (time.perf_counter() - start) * 1000,
+        },
+    )
+
+
+def _stream_event(payload: dict, event: str = '', sse: bool = False) -> str:
+    data = json.dumps(payload, ensure_ascii=False)
+    if not sse:
+        return data + '\n'
+    return (f"event: {event}\n" if event else '') + f"data: {data}\n\n"
+
+
+@app.route('/api/stream', methods=['POST'])
+def api_stream():
+    """
+    Streamed correction of a large upload: a multipart `file` field or a
+    raw text/plain body. The input is decoded, split and corrected in
+    batches as it is read, and every (original, corrected) pair is sent as
+    soon as its batch is done, as NDJSON or, with `Accept:
+    text/event-stream`, as server-sent events. Memory per request is
+    bounded by the batch size and the number of batches in flight.
+    """
+    uploaded_file = request.files.get('file')
+    if uploaded_file and uploaded_file.filename:
+        # Take the spooled file over: the request closes its files as soon
+        # as the view returns, before the response has been streamed
+        stream, uploaded_file.stream = uploaded_file.stream, io.BytesIO()
+    else:
+        stream = request.stream
+    sse = 'text/event-stream' in request.headers.get('Accept', '')
+
+    def generate():
+        count = 0
+        start = time.perf_counter()
+        try:
+            sentences = split_ahead('stream_split', iter_sentences(iter_lines(stream), sentence_tokenizer),
+                                    engine, app.config['STREAM_QUEUE_SIZE'])
+            # Batches go through the scheduler's fixed batch threads; corrected
+            # on this request thread, they would load a tagger per thread
+            for original, corrected in stream_corrections(
+                sentences, scheduler, app.config['STREAM_BATCH_SIZE'],
+                app.config['STREAM_MAX_IN_FLIGHT'], normalized=True
+            ):
+                count += 1
+                write_log([{"original": original, "corrected": corrected}])
+                yield _stream_event({"original": original, "corrected": corrected}, sse=sse)
+        except UnicodeDecodeError as e:
+            ERRORS.labels('api_stream').inc()
+            yield _stream_event({"error": f"Error reading file: {e}", "sentences": count}, 'error', sse)
+            return
+        except Exception as e:
+            ERRORS.labels('api_stream').inc()
+            print(f"Error while streaming corrections: {e}")
+            yield _stream_event({"error": "Correction failed", "sentences": count}, 'error', sse)
+            return
+        finally:
+            stream.close()
+        DOCUMENT_SECONDS.labels('stream').observe(time.perf_counter() - start)
+        yield _stream_event({"done": True, "sentences": count}, 'done', sse)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        # Keep proxies from buffering the whole response
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """
+    Queue a document for background correction. Body: {"text": "..."},
+    a multipart `file` field, or a raw text/plain body. Answers 202 with
+    the job ID; poll /api/jobs/<id> for progress.
+    """
+    if request.content_length is None or request.content_length > app.config['JOB_MAX_BYTES']:
+        return jsonify(error=f"Payload must be at most {app.config['JOB_MAX_BYTES']} bytes "
+                             "with a Content-Length header"), 413
+
+    uploaded_file = request.files.get('file')
+    try:
+        if uploaded_file and uploaded_file.filename:
+            text = uploaded_file.read().decode('utf-8')
+        elif request.is_json:
+            payload = request.get_json(silent=True)
+            text = payload.get('text') if isinstance(payload, dict) else None
+        else:
+            text = request.get_data().decode('utf-8')
+    except UnicodeDecodeError as e:
+        return jsonify(error=f"Error reading file: {e}"), 400
+    if not isinstance(text, str) or not text.strip():
+        return jsonify(error="Expected a non-empty document"), 400
+
+    job_id = jobs.submit(text)
+    return jsonify(id=job_id, status='queued',
+                   status_url=url_for('api_job_status', job_id=job_id)), 202
+
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """
+    Job status with progress: sentences done out of total. The total is
+    set once a worker has split the job, before correcting it; until then
+    progress is null.
+    """
+    job = jobs.store.get(job_id)
+    if job is None:
+        return jsonify(error="Unknown job"), 404
+    job['progress'] = job_progress(job)
+    if job['status'] == 'finished':
+        job['result_url'] = url_for('api_job_result', job_id=job_id)
+        job['log_url'] = url_for('api_job_log', job_id=job_id)
+    return jsonify(job)
+
+
+def _finished_job(job_id):
+    job = jobs.store.get(job_id)
+    if job is None:
+        return jsonify(error="Unknown job"), 404
+    if job['status'] != 'finished':
+        return jsonify(error=f"Job is {job['status']}", done=job['done'], total=job['total']), 409
+    return None
+
+
+@app.route('/api/jobs/<job_id>/result')
+def api_job_result(job_id):
+    """Corrected text of a finished job, one sentence per line"""
+    error = _finished_job(job_id)
+    if error is not None:
+        return error
+    lines = (corrected + '\n' for _, corrected in jobs.store.iter_results(job_id))
+    return Response(stream_with_context(lines), mimetype='text/plain; charset=utf-8',
+                    headers={'Content-Disposition': f'attachment; filename={job_id}.txt'})
+
+
+@app.route('/api/jobs/<job_id>/log')
+def api_job_log(job_id):
+    """Original and corrected sentences of a finished job, in log.json format"""
+    error = _finished_job(job_id)
+    if error is not None:
+        return error
+    lines = (json.dumps({"original": original, "corrected": corrected}, ensure_ascii=False) + '\n'
+             for original, corrected in jobs.store.iter_results(job_id))
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename={job_id}.json'})
+
+
+@app.route('/ready')
+def readiness():
+    """Readiness probe: 200 once warm-up has finished, 503 before"""
+    if ready.is_set():
+        return jsonify(ready=True, pid=os.getpid())
+    return jsonify(ready=False, pid=os.getpid()), 503
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of timers and counters"""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/memory')
+def api_memory():
+    """
+    Memory report of this process: RSS, RSS growth per loaded model,
+    the lexicon, documents in process_text and every cache's live size
+    and limit. Engine pool workers keep their own caches and budgets.
+    """
+    return jsonify(memory.report())
+
+
 if __name__ == '__main__':
-    app.run(host="127.0.0.1", port=5000, debug=True)
\ No newline at end of file
+    # No reloader: its parent process would import this module too, and run
+    # job workers and an engine pool of its own without serving requests
+    app.run(host="127.0.0.1", port=5000, debug=True, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: linear substring scan vs SubstringIndex for linking verbs.
+
+    python benchmarks/bench_linking_verbs.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus.txt')
+
+from grammarchecker import SubstringIndex
+
+
+def load_words(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return {line.strip() for line in f}
+
+
+def load_queries():
+    """Tokens from the benchmark corpus"""
+    queries = []
+    with open(CORPUS, 'r', encoding='utf-8') as f:
+        for line in f:
+            queries.extend(line.split())
+    return queries
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    linking_verbs = load_words(os.path.join(ROOT, 'resources', 'LinkingVerbs.txt'))
+    queries = load_queries() + sorted(linking_verbs)
+
+    def linear():
+        return [any(q in lv for lv in linking_verbs) for q in queries]
+
+    build_time = timeit.timeit(lambda: SubstringIndex(linking_verbs), number=1)
+    index = SubstringIndex(linking_verbs)
+
+    def indexed():
+        return [q in index for q in queries]
+
+    assert linear() == indexed(), "index disagrees with the linear scan"
+
+    linear_time = min(timeit.repeat(linear, number=1, repeat=args.repeat))
+    indexed_time = min(timeit.repeat(indexed, number=1, repeat=args.repeat))
+
+    print(f"lexicon: {len(linking_verbs)} words, index: {len(index)} substrings "
+          f"(built in {build_time * 1000:.2f} ms)")
+    print(f"queries: {len(queries)}")
+    print(f"linear scan: {linear_time / len(queries) * 1e6:.3f} us/query")
+    print(f"index:       {indexed_time / len(queries) * 1e6:.3f} us/query")
+    print(f"speedup:     {linear_time / indexed_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Scaling benchmark for PersianGrammarChecker._parse_sentence_components.
+
+Builds long tagged sentences by concatenating the tagged sentences of
+benchmarks/corpus.txt, then reports parse time per token for
+growing lengths. A linear parser keeps that figure flat.
+
+    python benchmarks/bench_parser.py --lengths 10 100 1000 5000
+    python benchmarks/bench_parser.py --against <git-rev>
+
+--against checks another git revision out into a temporary worktree and
+times its parser there, in a subprocess, on the same tagged input, so the
+old checker runs with the caching and lexicon modules of its own time.
+It also counts the corpus sentences the two parsers disagree on.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus.txt')
+
+from grammarchecker import PersianGrammarChecker
+from hazm_methods import parser as p
+from pipeline import iter_sentences
+
+
+def load_tagged_corpus():
+    with open(CORPUS, 'r', encoding='utf-8') as f:
+        sentences = list(iter_sentences(f))
+    return p.tagger_sents([p.getwordtokens(sentence) for sentence in sentences])
+
+
+def long_sentence(tagged, length):
+    tags = []
+    while len(tags) < length:
+        for sentence in tagged:
+            tags.extend(sentence)
+            if len(tags) >= length:
+                break
+    return tags[:length]
+
+
+# Run in the other revision's worktree: parse the corpus, time each length
+_AT_REV = """
+import json, sys, timeit
+sys.path.insert(0, '.')
+from grammarchecker import PersianGrammarChecker
+with open(sys.argv[1], encoding='utf-8') as f:
+    job = json.load(f)
+checker = PersianGrammarChecker()
+parse = checker._parse_sentence_components
+parses = [repr(parse([tuple(tag) for tag in tags])) for tags in job['corpus']]
+seconds = []
+for tags in job['inputs']:
+    tags = [tuple(tag) for tag in tags]
+    number = max(1, 2000 // len(tags))
+    seconds.append(min(timeit.repeat(lambda: parse(tags), number=number, repeat=job['repeat'])) / number)
+json.dump({'parses': parses, 'seconds': seconds}, sys.stdout)
+"""
+
+
+def run_at_rev(rev, corpus, inputs, repeat):
+    """Parse `corpus` and time `inputs` with the parser at `rev`; returns (parses, seconds)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, 'tree')
+        subprocess.run(['git', 'worktree', 'add', '--quiet', '--detach', worktree, rev],
+                       cwd=ROOT, check=True)
+        try:
+            # The tagger model is not in git
+            model = os.path.join(ROOT, 'resources', 'pos_tagger.model')
+            if os.path.exists(model):
+                os.symlink(model, os.path.join(worktree, 'resources', 'pos_tagger.model'))
+            job = os.path.join(tmp, 'job.json')
+            with open(job, 'w', encoding='utf-8') as f:
+                json.dump({'corpus': corpus, 'inputs': inputs, 'repeat': repeat}, f)
+            output = subprocess.run([sys.executable, '-c', _AT_REV, job], cwd=worktree,
+                                    check=True, capture_output=True, text=True).stdout
+        finally:
+            subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=ROOT, check=True)
+    result = json.loads(output)
+    return result['parses'], result['seconds']
+
+
+def time_parse(checker, tags, repeat):
+    number = max(1, 2000 // len(tags))
+    best = min(timeit.repeat(lambda: checker._parse_sentence_components(tags),
+                             number=number, repeat=repeat))
+    return best / number
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parser scaling benchmark")
+    arg_parser.add_argument('--lengths', type=int, nargs='*', default=[10, 50, 100, 500, 1000, 2000])
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--against', help="git revision to compare with")
+    args = arg_parser.parse_args()
+
+    tagged = load_tagged_corpus()
+    checker = PersianGrammarChecker()
+    inputs = [long_sentence(tagged, length) for length in args.lengths]
+
+    if args.against:
+        parses, other_seconds = run_at_rev(args.against, tagged, inputs, args.repeat)
+        mismatches = sum(repr(checker._parse_sentence_components(tags)) != other
+                         for tags, other in zip(tagged, parses))
+        print(f"fixed corpus: {len(tagged)} sentences, {mismatches} parse differences vs {args.against}")
+
+    header = f"{'tokens':>8}{'ms/parse':>12}{'us/token':>12}"
+    if args.against:
+        header += f"{args.against[:10] + ' us/tok':>20}{'speedup':>10}"
+    print(header)
+    for i, (length, tags) in enumerate(zip(args.lengths, inputs)):
+        seconds = time_parse(checker, tags, args.repeat)
+        row = f"{length:>8}{seconds * 1000:>12.3f}{seconds / length * 1e6:>12.3f}"
+        if args.against:
+            row += f"{other_seconds[i] / length * 1e6:>20.3f}{other_seconds[i] / seconds:>10.1f}x"
+        print(row)
+
+if __name__ == '__main__':
+    main()
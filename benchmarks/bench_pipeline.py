@@ -0,0 +1,248 @@
+"""
+Per-stage benchmark for the correction pipeline.
+
+Runs PersianGrammarChecker over the sentences of benchmarks/corpus.txt
+("fixed") and over synthetic corpora of growing size built by
+resampling them, timing every stage:
+
+    normalize   p.normalizer
+    tokenize    p.getwordtokens
+    tag         p.tagger / p.tagger_sents
+    parse       _parse_sentence_components
+    verb        _analyze_verb_properties
+    conjugate   p.conjugation
+    build       _build_corrected_sentence
+    end_to_end  PersianGrammarChecker.correct (sentence cache disabled)
+
+and reporting throughput, latency percentiles and peak memory.
+
+    python benchmarks/bench_pipeline.py --sizes 100 1000 --save baseline.json
+    python benchmarks/bench_pipeline.py --sizes 100 1000 --compare baseline.json --threshold 0.15
+
+With --compare the exit status is 1 if any stage's throughput dropped, or
+its p95 latency rose, by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Frozen copy of sample_text.txt and log.json's originals, so runs stay comparable
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus.txt')
+
+from grammarchecker import PersianGrammarChecker
+from hazm_methods import parser, registry, current_rss
+from pipeline import iter_sentences
+
+PARSER_STAGES = {
+    'normalize': 'normalizer',
+    'tokenize': 'getwordtokens',
+    'tag': 'tagger',
+    'conjugate': 'conjugation',
+}
+CHECKER_STAGES = {
+    'parse': '_parse_sentence_components',
+    'verb': '_analyze_verb_properties',
+    'build': '_build_corrected_sentence',
+}
+
+
+def load_fixed_corpus():
+    with open(CORPUS, 'r', encoding='utf-8') as f:
+        return list(iter_sentences(f))
+
+
+def synthetic_corpus(sentences, size, seed=0):
+    """Resample the fixed sentences up to `size`, deterministically"""
+    rng = random.Random(seed)
+    return [rng.choice(sentences) for _ in range(size)]
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(durations, items):
+    total = sum(durations)
+    return {
+        'calls': len(durations),
+        'total_s': total,
+        'items_per_s': items / total if total else 0.0,
+        'p50_ms': percentile(durations, 50) * 1000,
+        'p95_ms': percentile(durations, 95) * 1000,
+        'p99_ms': percentile(durations, 99) * 1000,
+    }
+
+
+class StageTimer:
+    """Wraps parser helpers and checker methods to record call durations"""
+
+    def __init__(self, checker):
+        self.checker = checker
+        self.durations = {name: [] for name in list(PARSER_STAGES) + list(CHECKER_STAGES)}
+        self._saved = {}
+
+    def _wrap(self, stage, func):
+        durations = self.durations[stage]
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                durations.append(time.perf_counter() - start)
+        return timed
+
+    def __enter__(self):
+        for stage, attr in PARSER_STAGES.items():
+            self._saved[attr] = parser.__dict__[attr]
+            setattr(parser, attr, staticmethod(self._wrap(stage, getattr(parser, attr))))
+        # Batched tagging counts towards the same stage
+        self._saved['tagger_sents'] = parser.__dict__['tagger_sents']
+        setattr(parser, 'tagger_sents',
+                staticmethod(self._wrap('tag', getattr(parser, 'tagger_sents'))))
+        for stage, attr in CHECKER_STAGES.items():
+            setattr(self.checker, attr, self._wrap(stage, getattr(self.checker, attr)))
+        return self
+
+    def __exit__(self, *exc):
+        for attr, original in self._saved.items():
+            setattr(parser, attr, original)
+        for attr in CHECKER_STAGES.values():
+            delattr(self.checker, attr)
+
+
+def run_corpus(sentences):
+    checker = PersianGrammarChecker(sentence_cache_size=0)
+
+    # Warm-up: model loads are reported by the registry, not timed here
+    checker.correct(sentences[0])
+
+    latencies = []
+    with StageTimer(checker) as timer:
+        start = time.perf_counter()
+        for sentence in sentences:
+            t0 = time.perf_counter()
+            checker.correct(sentence)
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+
+    stages = {stage: summarize(durations, len(durations))
+              for stage, durations in timer.durations.items()}
+    end_to_end = summarize(latencies, len(sentences))
+    end_to_end['wall_s'] = elapsed
+
+    batch_start = time.perf_counter()
+    checker.correct_batch(sentences)
+    batch_elapsed = time.perf_counter() - batch_start
+
+    # Separate pass for memory: tracemalloc slows everything down
+    tracemalloc.start()
+    checker.correct_batch(sentences)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'sentences': len(sentences),
+        'stages': stages,
+        'end_to_end': end_to_end,
+        'batch': {'total_s': batch_elapsed,
+                  'items_per_s': len(sentences) / batch_elapsed if batch_elapsed else 0.0},
+        'peak_python_bytes': peak,
+        'rss_bytes': current_rss(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return a list of human-readable regressions"""
+    regressions = []
+    for corpus, current in results['corpora'].items():
+        previous = baseline.get('corpora', {}).get(corpus)
+        if not previous:
+            continue
+        rows = dict(current['stages'], end_to_end=current['end_to_end'])
+        old_rows = dict(previous['stages'], end_to_end=previous['end_to_end'])
+        for stage, row in rows.items():
+            old = old_rows.get(stage)
+            if not old or not old['items_per_s']:
+                continue
+            drop = 1 - row['items_per_s'] / old['items_per_s']
+            if drop > threshold:
+                regressions.append(f"{corpus}/{stage}: throughput -{drop:.0%} "
+                                   f"({old['items_per_s']:.1f} -> {row['items_per_s']:.1f}/s)")
+            if old['p95_ms'] and row['p95_ms'] / old['p95_ms'] - 1 > threshold:
+                regressions.append(f"{corpus}/{stage}: p95 {old['p95_ms']:.3f} -> "
+                                   f"{row['p95_ms']:.3f} ms")
+    return regressions
+
+
+def print_report(results):
+    for corpus, result in results['corpora'].items():
+        print(f"\n== {corpus}: {result['sentences']} sentences ==")
+        print(f"{'stage':<12}{'calls':>8}{'total s':>10}{'per s':>12}"
+              f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        rows = dict(result['stages'], end_to_end=result['end_to_end'])
+        for stage, row in rows.items():
+            print(f"{stage:<12}{row['calls']:>8}{row['total_s']:>10.3f}{row['items_per_s']:>12.1f}"
+                  f"{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}")
+        print(f"correct_batch: {result['batch']['items_per_s']:.1f} sentences/s, "
+              f"peak python memory {result['peak_python_bytes'] / 2**20:.1f} MiB, "
+              f"RSS {result['rss_bytes'] / 2**20:.1f} MiB")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Per-stage benchmark for the correction pipeline")
+    arg_parser.add_argument('--sizes', type=int, nargs='*', default=[100, 1000],
+                            help="synthetic corpus sizes (sentences)")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--save', help="write results as JSON to this file")
+    arg_parser.add_argument('--compare', help="baseline JSON to compare against")
+    arg_parser.add_argument('--threshold', type=float, default=0.10,
+                            help="relative change treated as a regression (default 0.10)")
+    args = arg_parser.parse_args()
+
+    fixed = load_fixed_corpus()
+    corpora = {'fixed': fixed}
+    for size in args.sizes:
+        corpora[f'synthetic-{size}'] = synthetic_corpus(fixed, size, args.seed)
+
+    results = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'corpora': {},
+    }
+    for name, sentences in corpora.items():
+        results['corpora'][name] = run_corpus(sentences)
+    results['resources'] = registry.stats()
+
+    print_report(results)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
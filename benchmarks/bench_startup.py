@@ -0,0 +1,111 @@
+"""
+Cold-start benchmark.
+
+Starts fresh interpreters and measures how long it takes to import the
+project modules and to finish the first correction, with the load time
+of each hazm resource from the registry:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 5 --importtime 20
+
+--importtime N is the import-time report mode: it runs the import under
+`python -X importtime` and lists the N slowest modules, cumulative.
+
+The exit status is 1 if the median import or first-correction time is
+over budget (--import-budget, --first-budget; defaults are the targets
+documented in README.md).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET = 0.5
+FIRST_CORRECTION_BUDGET = 10.0
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+{imports}
+imported = time.perf_counter()
+hazm_loaded = 'hazm' in sys.modules
+from grammarchecker import get_grammar_checker
+from hazm_methods import registry
+get_grammar_checker().correct({sentence!r})
+first = time.perf_counter()
+print(json.dumps({{
+    'import_s': imported - start,
+    'first_correction_s': first - start,
+    'hazm_imported_at_import': hazm_loaded,
+    'resources': {{name: stats['load_seconds'] for name, stats in registry.stats().items()
+                   if stats['loads']}},
+}}))
+"""
+
+
+def run_child(modules, sentence):
+    code = CHILD.format(root=ROOT, imports='\n'.join(f'import {m}' for m in modules),
+                        sentence=sentence)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_report(modules, top):
+    """Slowest modules by cumulative import time, from -X importtime"""
+    code = f"import sys; sys.path.insert(0, {ROOT!r})\n" + '\n'.join(f'import {m}' for m in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            check=True, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    arg_parser.add_argument('--modules', nargs='*',
+                            default=['grammarchecker', 'engine', 'pipeline', 'logwriter', 'scheduler'],
+                            help="modules imported before the first correction")
+    arg_parser.add_argument('--sentence', default='من به مدرسه رفتم.')
+    arg_parser.add_argument('--runs', type=int, default=3)
+    arg_parser.add_argument('--importtime', type=int, metavar='N',
+                            help="list the N slowest imports")
+    arg_parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET)
+    arg_parser.add_argument('--first-budget', type=float, default=FIRST_CORRECTION_BUDGET)
+    args = arg_parser.parse_args()
+
+    if args.importtime:
+        print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+        for cumulative_us, self_us, name in import_report(args.modules, args.importtime):
+            print(f"{cumulative_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {name}")
+        print()
+
+    runs = [run_child(args.modules, args.sentence) for _ in range(args.runs)]
+    import_s = statistics.median(run['import_s'] for run in runs)
+    first_s = statistics.median(run['first_correction_s'] for run in runs)
+
+    print(f"import:           {import_s:.3f} s (budget {args.import_budget} s)")
+    print(f"first correction: {first_s:.3f} s (budget {args.first_budget} s)")
+    if any(run['hazm_imported_at_import'] for run in runs):
+        print("warning: hazm was imported at module import time")
+    print("resource loads (last run):")
+    for name, seconds in runs[-1]['resources'].items():
+        print(f"  {name:<20}{seconds:>8.3f} s")
+
+    if import_s > args.import_budget or first_s > args.first_budget:
+        print("\nCold start over budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: hazm.POSTagger vs CachedPOSTagger (tagging.py) on the same model.
+
+Tags the sentences of benchmarks/corpus.txt (or --input) with
+both, checks that every tag agrees, and reports time per token for a
+cold feature cache and a warm one, with the cache's hit rate.
+
+    python benchmarks/bench_tagger.py [--input FILE] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus.txt')
+
+from hazm_methods import parser as p, registry, TAGGER_MODEL
+from pipeline import iter_sentences
+from tagging import CachedPOSTagger, WordFeatureCache
+
+
+def load_sentences(path=None):
+    with open(path or CORPUS, 'r', encoding='utf-8') as f:
+        return [p.getwordtokens(sentence) for sentence in iter_sentences(f)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--input', help="text file to tag instead of the sample corpus")
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    sentences = load_sentences(args.input)
+    tokens = sum(len(sentence) for sentence in sentences)
+    hazm = registry.get('hazm')
+    from hazm.pos_tagger import punctuation_list
+
+    reference = hazm.POSTagger(model=TAGGER_MODEL)
+    cache = WordFeatureCache(punctuation_list)
+    cached = CachedPOSTagger(TAGGER_MODEL, cache)
+
+    cold_time = timeit.timeit(lambda: cached.tag_sents(sentences), number=1)
+    cold = cache.stats()
+    assert reference.tag_sents(sentences) == cached.tag_sents(sentences), \
+        "cached tagger disagrees with hazm"
+
+    hazm_time = min(timeit.repeat(lambda: reference.tag_sents(sentences), number=1, repeat=args.repeat))
+    warm_time = min(timeit.repeat(lambda: cached.tag_sents(sentences), number=1, repeat=args.repeat))
+    stats = cache.stats()
+
+    print(f"corpus: {len(sentences)} sentences, {tokens} tokens, {stats['entries']} word types "
+          f"({stats['bytes'] / 1024:.0f} KiB cached)")
+    print(f"hazm POSTagger:          {hazm_time / tokens * 1e6:.2f} us/token")
+    print(f"cached, cold cache:      {cold_time / tokens * 1e6:.2f} us/token "
+          f"(hit rate {cold['hit_rate']:.1%})")
+    print(f"cached, warm cache:      {warm_time / tokens * 1e6:.2f} us/token")
+    print(f"speedup (warm):          {hazm_time / warm_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import dataclasses
+import sys
+import threading
+
+
+# Sentinel returned by LRUCache.get on a miss (None is a valid cached value)
+MISSING = object()
+
+
+def approx_size(obj: Any) -> int:
+    """Rough memory footprint of a cached key or value in bytes"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list)):
+        size += sum(approx_size(item) for item in obj)
+    elif isinstance(obj, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in obj.items())
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        # getsizeof counts neither the instance dict nor what it holds
+        if hasattr(obj, '__dict__'):
+            size += sys.getsizeof(obj.__dict__)
+        size += sum(approx_size(getattr(obj, f.name)) for f in dataclasses.fields(obj))
+    return size
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and approximate memory"""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = approx_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        size = self._sizeof(key) + self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            self._evict()
+
+    def reaccount(self, key: Hashable):
+        """
+        Measure an entry again after its value was changed in place, so
+        the byte count and the byte limit see its current size
+        """
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return
+        value = entry[0]
+        size = self._sizeof(key) + self._sizeof(value)
+        with self._lock:
+            entry = self._data.get(key)
+            # Replaced or evicted meanwhile
+            if entry is None or entry[0] is not value:
+                return
+            self._bytes += size - entry[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                del self._data[key]
+                self._bytes -= size
+                self.evictions += 1
+                return
+            self._data[key] = (value, size)
+            self._evict()
+
+    def _evict(self):
+        # Caller holds the lock
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """Change the limits, evicting least recently used entries as needed"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SentenceCache(LRUCache):
+    """
+    Cache of corrected sentences keyed on normalized text.
+
+    A value of None means "returned unchanged". With a `lexicon_store`,
+    check_lexicon() drops the entries once the store has swapped in a new
+    lexicon (its generation went up), since new word lists can change the
+    correction. The store itself looks for edits at most once every
+    `check_interval` seconds.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: Optional[int] = None,
+                 lexicon_store=None):
+        super().__init__(max_entries, max_bytes)
+        self.lexicon_store = lexicon_store
+        self.invalidations = 0
+        self._generation = lexicon_store.generation if lexicon_store is not None else 0
+        self._generation_lock = threading.Lock()
+
+    def check_lexicon(self):
+        """Clear the cache if the lexicon was reloaded since the last check"""
+        store = self.lexicon_store
+        if store is None:
+            return
+        store.check()
+        if store.generation == self._generation:
+            return
+        with self._generation_lock:
+            if store.generation == self._generation:
+                return
+            self._generation = store.generation
+            self.invalidate()
+
+    def invalidate(self):
+        self.clear()
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats['invalidations'] = self.invalidations
+        return stats
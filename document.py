@@ -0,0 +1,92 @@
+from dataclasses import dataclass, field
+from hazm_methods import parser as p, SentenceTokenizer, registry
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class Sentence:
+    """
+    A normalized sentence. `start`/`end` locate it in Document.text;
+    tokens, tags and the correction are filled in by whichever stage
+    computes them first and reused by every later stage.
+    """
+    text: str
+    start: int = 0
+    end: int = 0
+    tokens: Optional[List[str]] = None
+    tags: Optional[List[Tuple[str, str]]] = None
+    corrected: Optional[str] = None
+
+    def get_tokens(self) -> List[str]:
+        if self.tokens is None:
+            self.tokens = p.getwordtokens(self.text)
+        return self.tokens
+
+    def get_tags(self) -> List[Tuple[str, str]]:
+        if self.tags is None:
+            self.tags = p.tagger(self.get_tokens())
+        return self.tags
+
+
+@dataclass
+class Document:
+    """Text normalized once and split into sentences"""
+    text: str = ''
+    sentences: List[Sentence] = field(default_factory=list)
+
+    @classmethod
+    def from_text(cls, text: str,
+                  sentence_tokenizer: Optional[SentenceTokenizer] = None) -> 'Document':
+        """Normalize each non-blank line and split it into sentences"""
+        normalizer = registry.get('normalizer')
+        sentence_tokenizer = sentence_tokenizer or SentenceTokenizer()
+        lines = []
+        sentences = []
+        offset = 0
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            normalized_line = normalizer.normalize(line.strip())
+            cursor = 0
+            for piece in sentence_tokenizer.tokenize(normalized_line):
+                piece = piece.strip()
+                if not piece:
+                    continue
+                start = normalized_line.find(piece, cursor)
+                if start < 0:
+                    start = cursor
+                cursor = start + len(piece)
+                sentences.append(Sentence(piece, offset + start, offset + cursor))
+            lines.append(normalized_line)
+            offset += len(normalized_line) + 1
+        return cls('\n'.join(lines), sentences)
+
+    @classmethod
+    def from_sentences(cls, sentences: List[str]) -> 'Document':
+        """Wrap sentences that are already normalized, one per line"""
+        document = cls()
+        offset = 0
+        for sentence in sentences:
+            document.sentences.append(Sentence(sentence, offset, offset + len(sentence)))
+            offset += len(sentence) + 1
+        document.text = '\n'.join(sentences)
+        return document
+
+    @property
+    def texts(self) -> List[str]:
+        return [sentence.text for sentence in self.sentences]
+
+    def tag(self):
+        """Tag every sentence that has no tags yet, in one tagger call"""
+        untagged = [sentence for sentence in self.sentences if sentence.tags is None]
+        if untagged:
+            tagged = p.tagger_sents([sentence.get_tokens() for sentence in untagged])
+            for sentence, tags in zip(untagged, tagged):
+                sentence.tags = tags
+
+    @property
+    def corrected_text(self) -> str:
+        return '\n'.join(
+            sentence.text if sentence.corrected is None else sentence.corrected
+            for sentence in self.sentences
+        )
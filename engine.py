@@ -0,0 +1,206 @@
+from grammarchecker import PersianGrammarChecker, get_grammar_checker
+from hazm_methods import registry
+from metrics import METRICS
+from typing import List, Optional, Tuple
+import concurrent.futures
+import atexit
+import math
+import os
+import threading
+
+
+# Per-process checker used inside pool workers
+_worker_checker = None
+
+# Sentences corrected by warm_up(): a plural subject, a compound verb, a linking verb
+WARMUP_SENTENCES = ['ما فردا به سفر می‌روم.', 'من سیب دوست داریم.', 'کارگران خسته است.']
+
+
+def warm_up(sentences: Optional[List[str]] = None) -> PersianGrammarChecker:
+    """
+    Load every model and lexicon and run a few corrections through the
+    process-wide checker, so the first real request does no loading
+    """
+    registry.preload()
+    checker = get_grammar_checker()
+    checker.correct_batch(list(sentences or WARMUP_SENTENCES))
+    return checker
+
+
+def _init_worker():
+    """Pool initializer: build the checker and load every model once per worker"""
+    global _worker_checker
+    # Forked workers inherit the parent's metric values; start from zero
+    METRICS.drain()
+    registry.preload()
+    _worker_checker = get_grammar_checker()
+
+
+def _correct_chunk(chunk: List[str], normalized: bool = False) -> Tuple[List[str], dict]:
+    """Correct a chunk in a worker; the worker's metrics travel back with it"""
+    return _worker_checker.correct_batch(chunk, normalized), METRICS.drain()
+
+
+def _collect(result: Tuple[List[str], dict]) -> List[str]:
+    corrected, metrics_state = result
+    METRICS.merge(metrics_state)
+    return corrected
+
+
+class CorrectionEngine:
+    """
+    Long-lived process pool around PersianGrammarChecker.correct_batch.
+
+    Correction is pure-Python CPU work, so threads do not scale past the
+    GIL. Sentences are split into chunks, each chunk is corrected in a
+    worker process that keeps its own warm checker, and results come back
+    in input order. Inputs smaller than `inline_threshold` are corrected
+    in the calling thread, where the pool's IPC would cost more than it saves.
+    """
+
+    MIN_CHUNK = 8
+    MAX_CHUNK = 256
+    # Aim for a few chunks per worker so a slow chunk does not stall the rest
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self, workers: Optional[int] = None, inline_threshold: int = 32,
+                 checker: Optional[PersianGrammarChecker] = None):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.inline_threshold = inline_threshold
+        self._checker = checker
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        # Used instead of the pool once a worker has died: forking a new pool
+        # from a process whose other threads may hold locks is not safe
+        self._fallback: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def checker(self) -> PersianGrammarChecker:
+        if self._checker is None:
+            self._checker = get_grammar_checker()
+        return self._checker
+
+    def start(self):
+        """
+        Fork the pool's workers now. Call this before the process starts
+        any other thread: a fork copies locks held by other threads into
+        the workers, where nothing will ever release them.
+        """
+        if self.workers > 1:
+            # With the fork start method the first task launches every worker
+            self._get_pool().submit(os.getpid).result()
+
+    def _get_pool(self):
+        """The process pool, or the thread fallback once a worker has died"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            if self._fallback is not None:
+                return self._fallback
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker
+                )
+            return self._pool
+
+    def _drop_pool(self):
+        # A worker died (e.g. OOM-killed); correct on threads from now on
+        print("Correction worker died; falling back to threads")
+        with self._lock:
+            pool, self._pool = self._pool, None
+            if self._fallback is None:
+                self._fallback = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='correct'
+                )
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def chunk_size(self, count: int) -> int:
+        """Chunk size tuned to the input size and worker count"""
+        size = math.ceil(count / (self.workers * self.CHUNKS_PER_WORKER))
+        return max(self.MIN_CHUNK, min(self.MAX_CHUNK, size))
+
+    def correct(self, sentences: List[str], normalized: bool = False) -> List[str]:
+        """
+        Correct sentences, returning results in input order. normalized=True
+        skips normalization for sentences that already went through it.
+        """
+        if not sentences:
+            return []
+        if self.workers <= 1 or len(sentences) < self.inline_threshold:
+            return self.checker.correct_batch(sentences, normalized)
+
+        size = self.chunk_size(len(sentences))
+        chunks = [sentences[i:i + size] for i in range(0, len(sentences), size)]
+        pool = self._get_pool()
+        if pool is self._fallback:
+            results = pool.map(self.checker.correct_batch, chunks, [normalized] * len(chunks))
+            return [corrected for chunk in results for corrected in chunk]
+        try:
+            results = pool.map(_correct_chunk, chunks, [normalized] * len(chunks))
+            return [corrected for result in results for corrected in _collect(result)]
+        except concurrent.futures.process.BrokenProcessPool:
+            self._drop_pool()
+            return self.correct(sentences, normalized)
+
+    def submit(self, sentences: List[str], normalized: bool = False) -> concurrent.futures.Future:
+        """
+        Correct one batch asynchronously, returning a Future of the
+        corrected list. The whole batch goes to a single worker.
+        """
+        if self.workers <= 1:
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(self.checker.correct_batch(sentences, normalized))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        pool = self._get_pool()
+        if pool is self._fallback:
+            return pool.submit(self.checker.correct_batch, sentences, normalized)
+        try:
+            worker_future = pool.submit(_correct_chunk, sentences, normalized)
+        except concurrent.futures.process.BrokenProcessPool:
+            self._drop_pool()
+            return self.submit(sentences, normalized)
+        future = concurrent.futures.Future()
+
+        def unwrap(done: concurrent.futures.Future):
+            try:
+                future.set_result(_collect(done.result()))
+            except BaseException as e:
+                future.set_exception(e)
+
+        worker_future.add_done_callback(unwrap)
+        return future
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+            fallback, self._fallback = self._fallback, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if fallback is not None:
+            fallback.shutdown(wait=True, cancel_futures=True)
+
+
+# Singleton instance
+_engine_instance = None
+
+
+def get_engine() -> CorrectionEngine:
+    """Process-wide engine; worker count comes from GEC_WORKERS (default: CPU count)"""
+    global _engine_instance
+    if _engine_instance is None:
+        workers = int(os.environ.get('GEC_WORKERS', 0)) or None
+        _engine_instance = CorrectionEngine(workers=workers)
+        # Fork the workers while the caller has not started other threads yet
+        _engine_instance.start()
+        atexit.register(_engine_instance.shutdown)
+    return _engine_instance
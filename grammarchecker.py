@@ -1,8 +1,29 @@
 from hazm_methods import parser as p
+from caching import LRUCache, SentenceCache, MISSING
+from lexicon import LexiconStore, get_lexicon_store
+from memory import get_memory_budget
+from rules import PARSE_RULES, ParseState, Rule, RuleTable
+from document import Document, Sentence
+from metrics import STAGE_SECONDS, SENTENCES, SENTENCES_UNCHANGED, CACHE_LOOKUPS
 from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 from enum import Enum
 import re
+import threading
+import time
+
+# Metric children bound once; observing them is a bisect and an addition
+_STAGE = {stage: STAGE_SECONDS.labels(stage) for stage in
+          ('normalize', 'tokenize', 'tag', 'parse', 'verb', 'conjugate', 'build',
+           # correct_batch observes these once per batch rather than per sentence
+           'normalize_batch', 'tokenize_batch', 'tag_batch')}
+_UNCHANGED_NO_VERB = SENTENCES_UNCHANGED.labels('no_verb')
+_UNCHANGED_NO_TENSE = SENTENCES_UNCHANGED.labels('no_tense')
+_SENTENCE_CACHE_HIT = CACHE_LOOKUPS.labels('sentence', 'hit')
+_SENTENCE_CACHE_MISS = CACHE_LOOKUPS.labels('sentence', 'miss')
+_VERB_CACHE_HIT = CACHE_LOOKUPS.labels('verb', 'hit')
+_VERB_CACHE_MISS = CACHE_LOOKUPS.labels('verb', 'miss')
+
 
 class VerbTense(Enum):
     """Persian verb tenses"""
@@ -70,31 +91,32 @@ class VerbProperties:
     is_passive: bool
     is_precedent: bool
     is_progressive: bool
-    
+
+    # Built once for the class; an unannotated attribute is not a dataclass field
+    TENSE_TABLE = {
+        (False, True, True, False, False, False, False, False): VerbTense.NEGATIVE_IMPERFECTIVE_PAST,
+        (False, False, True, False, False, False, False, False): VerbTense.IMPERFECTIVE_PAST,
+        (False, True, False, False, False, False, False, False): VerbTense.NEGATIVE_PERFECTIVE_PAST,
+        (False, False, False, False, True, False, False, False): VerbTense.PASSIVE_PERFECTIVE_PAST,
+        (False, True, False, False, True, False, False, False): VerbTense.NEGATIVE_PASSIVE_PERFECTIVE_PAST,
+        (False, False, False, False, False, False, False, False): VerbTense.PERFECTIVE_PAST,
+        (False, False, False, False, False, False, False, True): VerbTense.PROGRESSIVE_PAST,
+        (False, False, False, False, False, False, True, False): VerbTense.PAST_PRECEDENT,
+        (False, True, False, False, False, False, True, False): VerbTense.NEGATIVE_PAST_PRECEDENT,
+        (None, False, False, False, False, True, False, False): VerbTense.PERFECTIVE_FUTURE,
+        (None, True, False, False, False, True, False, False): VerbTense.NEGATIVE_PERFECTIVE_FUTURE,
+        (True, True, True, False, False, False, False, False): VerbTense.NEGATIVE_IMPERFECTIVE_PRESENT,
+        (True, False, True, False, False, False, False, False): VerbTense.IMPERFECTIVE_PRESENT,
+        (True, False, False, True, False, False, False, False): VerbTense.SUBJUNCTIVE_PERFECTIVE_PRESENT,
+        (True, False, False, False, True, False, False, False): VerbTense.PASSIVE_PERFECTIVE_PRESENT,
+        (True, True, False, False, True, False, False, False): VerbTense.NEGATIVE_PASSIVE_PERFECTIVE_PRESENT,
+        (True, True, False, False, False, False, False, False): VerbTense.NEGATIVE_PERFECTIVE_PRESENT,
+        (True, False, False, False, False, False, False, False): VerbTense.PERFECTIVE_PRESENT,
+        (True, False, False, False, False, False, False, True): VerbTense.PROGRESSIVE_PRESENT,
+    }
+
     def to_tense(self) -> str:
         """Convert verb properties to tense string"""
-        tense_map = {
-            (False, True, True, False, False, False, False, False): VerbTense.NEGATIVE_IMPERFECTIVE_PAST,
-            (False, False, True, False, False, False, False, False): VerbTense.IMPERFECTIVE_PAST,
-            (False, True, False, False, False, False, False, False): VerbTense.NEGATIVE_PERFECTIVE_PAST,
-            (False, False, False, False, True, False, False, False): VerbTense.PASSIVE_PERFECTIVE_PAST,
-            (False, True, False, False, True, False, False, False): VerbTense.NEGATIVE_PASSIVE_PERFECTIVE_PAST,
-            (False, False, False, False, False, False, False, False): VerbTense.PERFECTIVE_PAST,
-            (False, False, False, False, False, False, False, True): VerbTense.PROGRESSIVE_PAST,
-            (False, False, False, False, False, False, True, False): VerbTense.PAST_PRECEDENT,
-            (False, True, False, False, False, False, True, False): VerbTense.NEGATIVE_PAST_PRECEDENT,
-            (None, False, False, False, False, True, False, False): VerbTense.PERFECTIVE_FUTURE,
-            (None, True, False, False, False, True, False, False): VerbTense.NEGATIVE_PERFECTIVE_FUTURE,
-            (True, True, True, False, False, False, False, False): VerbTense.NEGATIVE_IMPERFECTIVE_PRESENT,
-            (True, False, True, False, False, False, False, False): VerbTense.IMPERFECTIVE_PRESENT,
-            (True, False, False, True, False, False, False, False): VerbTense.SUBJUNCTIVE_PERFECTIVE_PRESENT,
-            (True, False, False, False, True, False, False, False): VerbTense.PASSIVE_PERFECTIVE_PRESENT,
-            (True, True, False, False, True, False, False, False): VerbTense.NEGATIVE_PASSIVE_PERFECTIVE_PRESENT,
-            (True, True, False, False, False, False, False, False): VerbTense.NEGATIVE_PERFECTIVE_PRESENT,
-            (True, False, False, False, False, False, False, False): VerbTense.PERFECTIVE_PRESENT,
-            (True, False, False, False, False, False, False, True): VerbTense.PROGRESSIVE_PRESENT,
-        }
-        
         # Future overrides present check in key generation
         p_val = self.is_present if not self.is_future else None
 
@@ -109,68 +131,273 @@ class VerbProperties:
             self.is_progressive
         )
         
-        tense = tense_map.get(key)
+        tense = self.TENSE_TABLE.get(key)
         return tense.value if tense else ''
 
 
+class SubstringIndex:
+    """
+    Set of every substring of every word in a lexicon, so that
+    `query in index` answers `any(query in word for word in words)`
+    with a single hash lookup.
+    """
+
+    def __init__(self, words):
+        substrings = set()
+        for word in words:
+            length = len(word)
+            for start in range(length + 1):
+                for end in range(start, length + 1):
+                    substrings.add(word[start:end])
+        self._substrings = frozenset(substrings)
+
+    def __contains__(self, query: str) -> bool:
+        return query in self._substrings
+
+    def __len__(self) -> int:
+        return len(self._substrings)
+
+
+class TokenClaims:
+    """
+    Parser bookkeeping by token position: which tokens have been claimed
+    by some component, and which positions make up the subject, object
+    and complement. Every operation is O(1) per token, so a parse is
+    linear in sentence length, and repeated words are told apart.
+    """
+
+    __slots__ = ('claimed', 'members')
+
+    def __init__(self, size: int):
+        self.claimed = [False] * size
+        self.members = {'subject': set(), 'object': set(), 'complement': set()}
+
+    def claim(self, *indexes: int):
+        for index in indexes:
+            self.claimed[index] = True
+
+    def set_members(self, component: str, *indexes: int):
+        self.members[component] = set(indexes)
+
+    def add_members(self, component: str, *indexes: int):
+        self.members[component].update(indexes)
+
+    def owns(self, component: str, index: int) -> bool:
+        return index in self.members[component]
+
+    def unclaimed(self) -> List[int]:
+        return [i for i, claimed in enumerate(self.claimed) if not claimed]
+
+
+@dataclass
+class WordAnalysis:
+    """Per-word analysis results; None means not computed yet"""
+    lemma: Optional[str] = None
+    is_plural: Optional[bool] = None
+    is_linking: Optional[bool] = None
+
+
+class WordAnalysisCache:
+    """
+    Bounded, thread-safe cache of WordAnalysis entries keyed by surface form.
+    Counts how many lemmatizer calls were served from the cache.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self._cache = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self.lemmatizer_calls = 0
+        self.lemmatizer_calls_avoided = 0
+
+    def entry(self, word: str) -> WordAnalysis:
+        analysis = self._cache.get(word)
+        if analysis is MISSING:
+            analysis = WordAnalysis()
+            self._cache.put(word, analysis)
+        return analysis
+
+    def lemma(self, word: str) -> str:
+        """Full lemma ('past#present' for verbs), as returned by p.lemmatizer"""
+        analysis = self.entry(word)
+        if analysis.lemma is None:
+            analysis.lemma = p.lemmatizer(word)
+            # The entry grew after it was stored
+            self._cache.reaccount(word)
+            with self._lock:
+                self.lemmatizer_calls += 1
+        else:
+            with self._lock:
+                self.lemmatizer_calls_avoided += 1
+        return analysis.lemma
+
+    def clear(self):
+        self._cache.clear()
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self._cache.resize(max_entries, max_bytes)
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats['lemmatizer_calls'] = self.lemmatizer_calls
+        stats['lemmatizer_calls_avoided'] = self.lemmatizer_calls_avoided
+        return stats
+
+
+@dataclass
+class VerbAnalysis:
+    """Analysis of one verb form: lemma, properties, tense and conjugations by root"""
+    lemma: str
+    properties: VerbProperties
+    tense: str
+    clean_root: str
+    conjugations: dict = field(default_factory=dict)
+    # Its key in VerbAnalysisCache
+    key: Optional[Tuple[str, str, bool, bool]] = None
+
+
+class VerbAnalysisCache:
+    """
+    Bounded, thread-safe cache of VerbAnalysis entries keyed by
+    (conjugatable part, noun part, linking flag, verb-part flag),
+    which is everything _analyze_verb_properties depends on.
+    Counts how many p.conjugation calls were served from the cache.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self._cache = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self.conjugation_calls = 0
+        self.conjugation_calls_avoided = 0
+
+    def get(self, key: Tuple[str, str, bool, bool]):
+        analysis = self._cache.get(key)
+        (_VERB_CACHE_MISS if analysis is MISSING else _VERB_CACHE_HIT).inc()
+        return analysis
+
+    def put(self, key: Tuple[str, str, bool, bool], analysis: VerbAnalysis):
+        self._cache.put(key, analysis)
+
+    def conjugate(self, analysis: VerbAnalysis, root: str):
+        """p.conjugation(root, analysis.tense), computed once per entry and root"""
+        verb_list = analysis.conjugations.get(root, MISSING)
+        if verb_list is MISSING:
+            verb_list = p.conjugation(root, analysis.tense)
+            analysis.conjugations[root] = verb_list
+            if analysis.key is not None:
+                # The entry grew after it was stored
+                self._cache.reaccount(analysis.key)
+            with self._lock:
+                self.conjugation_calls += 1
+        else:
+            with self._lock:
+                self.conjugation_calls_avoided += 1
+        return verb_list
+
+    def clear(self):
+        self._cache.clear()
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self._cache.resize(max_entries, max_bytes)
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats['conjugation_calls'] = self.conjugation_calls
+        stats['conjugation_calls_avoided'] = self.conjugation_calls_avoided
+        return stats
+
+
 class PersianGrammarChecker:
     """Persian grammar checker with rule-based correction"""
     
     PERSON_IDENTIFIERS = sorted(['م', 'ی', 'ه', 'یم', 'ید', 'ند'], key=len, reverse=True)
-    PRONOUNS = ['من', 'تو', 'او', 'ما', 'شما', 'آنها']
-    # Compound verbs that use 'dashtan' (to have) as a root but are NOT progressive auxiliary
-    NON_PROGRESSIVE_COMPOUNDS = ['دوست', 'احتمال', 'نیاز', 'انتظار', 'خبر', 'باور', 'یاد'] 
     
-    def __init__(self):
-        self.linking_verbs = self._load_linking_verbs()
-        self.adverbs = self._load_adverbs()
-    
-    def _load_linking_verbs(self) -> set:
-        try:
-            with open("//resources//LinkingVerbs.txt", "r", encoding="utf-8") as f:
-                return {line.strip() for line in f}
-        except FileNotFoundError:
-            return {'است', 'بود', 'شد', 'هست', 'نیست', 'باش', 'بودن'}
-    
-    def _load_adverbs(self) -> set:
-        try:
-            with open("//resources//adverbs.txt", "r", encoding="utf-8") as f:
-                return {line.strip() for line in f}
-        except FileNotFoundError:
-            return {'دیروز', 'امروز', 'فردا', 'خوب', 'بد', 'سریع', 'آهسته', 'همیشه', 'هرگز', 'زود'}
+    def __init__(self, sentence_cache_size: int = 10000,
+                 sentence_cache_bytes: Optional[int] = 32 * 1024 * 1024,
+                 verb_cache_size: int = 10000,
+                 lexicon_store: Optional[LexiconStore] = None,
+                 parse_rules: Optional[List[Rule]] = None):
+        # Cleared by check_lexicon() when the word lists change
+        self.sentence_cache = SentenceCache(sentence_cache_size, sentence_cache_bytes)
+        self.word_cache = WordAnalysisCache()
+        self.verb_cache = VerbAnalysisCache(verb_cache_size)
+        # Word lists (linking verbs, adverbs, ...) from resources/, reloaded on edit
+        self.lexicon_store = lexicon_store or get_lexicon_store()
+        self._lexicon_lock = threading.Lock()
+        self._use_lexicon()
+        # Token rules for _parse_sentence_components, compiled once
+        self.rule_table = RuleTable(PARSE_RULES if parse_rules is None else parse_rules)
+
+    def _use_lexicon(self):
+        store = self.lexicon_store
+        self._lexicon_generation = store.generation
+        lexicon = store.lexicon
+        # Lists probed per sentence get in-memory sets; a WordList lookup
+        # is a binary search over the mapped file
+        self.linking_verbs = lexicon['linking_verbs']
+        self.linking_verb_index = SubstringIndex(self.linking_verbs)
+        self.adverbs = frozenset(lexicon['adverbs'])
+        self.singular_exceptions = frozenset(lexicon['singular_exceptions'])
+        self.non_progressive_compounds = tuple(lexicon['non_progressive_compounds'])
+        self.lexicon = lexicon
+
+    def check_lexicon(self):
+        """
+        Pick up a reloaded lexicon. Everything derived from the old word
+        lists goes with it: the substring index, memoized word and verb
+        analyses, and cached corrections.
+        """
+        self.lexicon_store.check()
+        if self.lexicon_store.generation == self._lexicon_generation:
+            return
+        with self._lexicon_lock:
+            if self.lexicon_store.generation == self._lexicon_generation:
+                return
+            self._use_lexicon()
+            self.word_cache.clear()
+            self.verb_cache.clear()
+            self.sentence_cache.invalidate()
     
-    def _is_plural_noun(self, noun: str) -> bool:
+    def is_plural_noun(self, noun: str) -> bool:
+        """Whether a noun is plural, memoized per word"""
+        analysis = self.word_cache.entry(noun)
+        if analysis.is_plural is None:
+            analysis.is_plural = self._check_plural_noun(noun)
+        return analysis.is_plural
+
+    def _check_plural_noun(self, noun: str) -> bool:
         if noun.endswith("ها") or noun.endswith("های"):
             return True
         
         if noun.endswith("ان"):
             # 1. Whitelist of singular words ending in 'an'
-            singular_exceptions = {
-                'باران', 'تهران', 'ایران', 'آسمان', 'زمستان', 'تابستان', 
-                'داستان', 'دندان', 'زبان', 'جهان', 'جان', 'نان', 'لیوان',
-                'کیهان', 'طوفان', 'جریان', 'درمان', 'فرمان', 'خیابان', 
-                'بیابان', 'کوهستان', 'دبیرستان', 'بیمارستان', 'استان'
-            }
-            if noun in singular_exceptions:
+            if noun in self.singular_exceptions:
                 return False
             
             # 2. Use Lemmatizer (Dictionary) instead of Stemmer (Algorithmic)
             # Stemmer maps 'Baran' -> 'Bar' (Load), causing false plural detection.
             # Lemmatizer maps 'Baran' -> 'Baran' (Rain), preserving singularity.
-            lemma = p.lemmatizer(noun).split('#')[0]
+            lemma = self.word_cache.lemma(noun).split('#')[0]
             if lemma != noun:
                 return True
                 
         return False
     
-    def _is_linking_verb(self, verb: str) -> bool:
-        if any(verb in linking_verb for linking_verb in self.linking_verbs):
+    def is_linking_verb(self, verb: str) -> bool:
+        """Whether a verb is (part of) a linking verb, memoized per word"""
+        analysis = self.word_cache.entry(verb)
+        if analysis.is_linking is None:
+            analysis.is_linking = self._check_linking_verb(verb)
+        return analysis.is_linking
+
+    def _check_linking_verb(self, verb: str) -> bool:
+        # Substring of any linking verb, answered by the precomputed index
+        if verb in self.linking_verb_index:
             return True
-        lemmatized = p.lemmatizer(verb).split('#')[0]
+        lemmatized = self.word_cache.lemma(verb).split('#')[0]
         # Specific check for Budan/Hastan roots
         if lemmatized in ['بود', 'هست', 'باش']:
             return True
-        return any(lemmatized in linking_verb for linking_verb in self.linking_verbs)
+        return lemmatized in self.linking_verb_index
     
     def _classify_adverbs(self, adverbs: List[str]) -> Tuple[str, str]:
         starting_adverb = ''
@@ -235,12 +462,12 @@ class PersianGrammarChecker:
             #Progressive Check: blacklist "doost daram", "ehteram daram", etc.
             is_progressive = False
             if ('داشت' in verb or 'دار' in verb) and is_verb_part:
-                if noun_part and any(x in noun_part for x in self.NON_PROGRESSIVE_COMPOUNDS):
+                if noun_part and any(x in noun_part for x in self.non_progressive_compounds):
                     is_progressive = False
                 else:
                     is_progressive = True
 
-            if 'بود' in verb and not self._is_linking_verb(verb):
+            if 'بود' in verb and not self.is_linking_verb(verb):
                  is_precedent = True # e.g. Bude ast
             else:
                  # Standard precedent check (Rafte ast)
@@ -267,6 +494,31 @@ class PersianGrammarChecker:
                 is_progressive=is_progressive
             )
  
+    def _analyze_verb(self, conjugatable_part: str, noun_part: str,
+                      is_linking: bool, is_verb_part: bool) -> VerbAnalysis:
+        """Lemma, properties and tense of a verb form, memoized in verb_cache"""
+        key = (conjugatable_part, noun_part, is_linking, is_verb_part)
+        analysis = self.verb_cache.get(key)
+        if analysis is not MISSING:
+            return analysis
+
+        # Get Lemma
+        lemma_full = self.word_cache.lemma(conjugatable_part)
+
+        # Analyze Properties
+        verb_props = self._analyze_verb_properties(
+            conjugatable_part, lemma_full, is_linking, is_verb_part, noun_part
+        )
+
+        # Clean the stem before conjugation (remove prefixes like 'mi', 'nemi')
+        clean_root = lemma_full.split('#')[0]
+        if verb_props.is_present and '#' in lemma_full:
+            clean_root = lemma_full.split('#')[1]
+
+        analysis = VerbAnalysis(lemma_full, verb_props, verb_props.to_tense(), clean_root, key=key)
+        self.verb_cache.put(key, analysis)
+        return analysis
+
     def _select_correct_verb_form(self, subject: str, subject_is_plural: bool, 
                                    verb_list) -> str:
         if not isinstance(verb_list, list) or not verb_list:
@@ -291,217 +543,31 @@ class PersianGrammarChecker:
     def _parse_sentence_components(self, tags: List[Tuple[str, str]]) -> Tuple[SentenceComponents, SentenceFlags]:
         components = SentenceComponents()
         flags = SentenceFlags()
-        
-        # Collect all words initially to manage "untagged" list
-        for tag in tags:
-            word, pos = tag
-            components.untagged_words.append(word)
+        # Track claims by token position instead of removing words from a list
+        claims = TokenClaims(len(tags))
          
-        for i, tag in enumerate(tags):
-            word, pos = tag
-            next_tag = tags[i + 1] if i + 1 < len(tags) else None
-            prev_tag = tags[i - 1] if i - 1 >= 0 else None
-            
-            if pos in ['PUNCT', 'PUNC']:
-                if word in ['?', '!', '.', ';', '؟', '؛']:
-                    components.final_punctuation = word
-                if word in components.untagged_words:
-                    components.untagged_words.remove(word)
-
-            elif pos in ['ADP', 'ADP,EZ']:
-                self._handle_adposition(word, next_tag, components, flags)
-            
-            elif pos in ['PRON', 'NOUN', 'NOUN,EZ']:
-                self._handle_noun_or_pronoun(word, next_tag, components, flags)
-            elif pos == 'DET':
-                self._handle_determiner(word, next_tag, components, flags)
-            elif pos == 'CCONJ':
-                self._handle_conjunction(word, next_tag, prev_tag, components, flags)
-            elif pos == 'ADV':
-                components.adverbs.append(word)
-                if word in components.untagged_words:
-                    components.untagged_words.remove(word)
-            elif pos in ['ADJ', 'ADJ,EZ']:
-                self._handle_adjective(word, prev_tag, components, flags)
-            elif pos == 'VERB':
-                self._handle_verb(word, next_tag, prev_tag, components, flags)
-            elif pos == 'SCONJ':
-                self._handle_subordinating_conjunction(word, prev_tag, components)
-        
+        self.rule_table.apply(ParseState(self, tags, components, flags, claims))
+
+        unclaimed = claims.unclaimed()
+
         #Post-Processing: Compound Verbs
         # If we have an untagged word right before the verb that wasn't claimed, it's likely part of the verb.
-        if components.verb and components.untagged_words:
+        if components.verb and unclaimed:
             verb_parts = components.verb.split('_')
             # Only if the verb doesn't already have a noun part attached via the loop
             if len(verb_parts) == 1 or (flags.verb_part_found and '_' not in components.verb):
-                last_untagged = components.untagged_words[-1]
+                last_untagged = tags[unclaimed[-1]][0]
                 # Heuristic: The untagged word is physically close to the end of the sentence
                 # Ideally check index, but here we assume parsing order.
                 if not flags.noun_complement_found and not flags.linking_verb:
                     # Merge into verb
                     components.verb = f"{last_untagged}_{components.verb}"
                     flags.verb_part_found = True
-                    components.untagged_words.remove(last_untagged)
+                    unclaimed.pop()
 
+        components.untagged_words = [tags[i][0] for i in unclaimed]
         return components, flags
   
-    def _handle_adposition(self, word: str, next_tag: Optional[Tuple[str, str]],
-                          components: SentenceComponents, flags: SentenceFlags):
-        if word == "را":
-            return
-
-        if next_tag and next_tag[1] in ['PRON', 'NOUN', 'NOUN,EZ', 'DET', 'ADJ', 'ADJ,EZ']:
-            components.complement = next_tag[0]
-            components.adposition = word
-            flags.complement_found = True
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-            if next_tag[0] in components.untagged_words:
-                components.untagged_words.remove(next_tag[0])
-
-    def _handle_noun_or_pronoun(self, word: str, next_tag: Optional[Tuple[str, str]],
-                                components: SentenceComponents, flags: SentenceFlags):
-        if flags.complement_found and word == components.complement:
-            return
-        
-        # Noun Clause (Vocative: "Ali!")
-        if next_tag and next_tag[0] == '!':
-            components.noun_clause = word
-            flags.noun_clause_found = True
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-         
-        elif next_tag and next_tag[0] == 'را':
-            components.object = word
-            flags.object_found = True
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-            if next_tag[0] in components.untagged_words:
-                components.untagged_words.remove(next_tag[0])
-         
-        elif not flags.subject_found:
-            components.subject = word
-            flags.subject_found = True
-            flags.subject_is_plural = self._is_plural_noun(word) or word in ['ما', 'شما', 'آنها']
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-
-    def _handle_determiner(self, word: str, next_tag: Optional[Tuple[str, str]],
-                          components: SentenceComponents, flags: SentenceFlags):
-        if next_tag and next_tag[1] in ['PRON', 'NOUN', 'NOUN,EZ', 'ADJ', 'ADJ,EZ']:
-            # Attach determiner to whatever follows it
-            combined = f"{word} {next_tag[0]}"
-            # We don't know yet if next_tag[0] is Subject/Object, so we just prep it? 
-            # Actually, standard logic usually fills Subject/Object when hitting the Noun.
-            # This logic updates the ALREADY found component if we are backtracking, 
-            # OR we need to wait. 
-            # Simplified: If we haven't found subject yet, this Det+Noun will be subject.
-            pass 
-            # Note: The original logic here was slightly flawed/recursive. 
-            # For robustness, we will let the Noun handler pick up the noun, 
-            # and here we just ensure the determiner isn't left 'untagged'.
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-            # We prepend it to the next noun in untagged handling or reconstruction if needed.
-            # But strictly, simpler to just treat as untagged_word that gets placed before Subject?
-            # Or better: Prepend to the component if the next word becomes a component.
-    
-    def _handle_conjunction(self, word: str, next_tag: Optional[Tuple[str, str]], 
-                           prev_tag: Optional[Tuple[str, str]], 
-                           components: SentenceComponents, flags: SentenceFlags):
-        if not next_tag or next_tag[1] not in ['PRON', 'NOUN', 'NOUN,EZ']:
-            return
-        
-        # safer check using 'in' to handle multi-word subjects
-        if flags.subject_found and prev_tag and prev_tag[0] in components.subject:
-            components.subject = f"{components.subject} {word} {next_tag[0]}"
-            flags.subject_is_plural = True
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-            if next_tag[0] in components.untagged_words:
-                components.untagged_words.remove(next_tag[0])
-
-        elif prev_tag and prev_tag[0] in components.complement:
-            components.complement = f"{components.complement} {word} {next_tag[0]}"
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-
-        elif prev_tag and prev_tag[0] in components.object:
-            components.object = f"{components.object} {word} {next_tag[0]}"
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-    
-    def _handle_adjective(self, word: str, prev_tag: Optional[Tuple[str, str]],
-                         components: SentenceComponents, flags: SentenceFlags):
-        if not prev_tag: return
-
-        if prev_tag[0] in components.subject:
-            components.subject = f"{components.subject} {word}"
-            if word in components.untagged_words: components.untagged_words.remove(word)
-
-        elif prev_tag[0] in components.object:
-            components.object = f"{components.object} {word}"
-            if word in components.untagged_words: components.untagged_words.remove(word)
-
-        elif prev_tag[0] in components.complement:
-            components.complement = f"{components.complement} {word}"
-            if word in components.untagged_words: components.untagged_words.remove(word)
-
-        elif flags.linking_verb and not flags.noun_complement_found:
-            components.noun_complement = word
-            flags.noun_complement_found = True
-            if word in components.untagged_words: components.untagged_words.remove(word)
-
-    def _handle_verb(self, word: str, next_tag: Optional[Tuple[str, str]],
-                        prev_tag: Optional[Tuple[str, str]],
-                        components: SentenceComponents, flags: SentenceFlags):
-            if not flags.verb_found:
-                components.verb = word
-                flags.verb_found = True
-                flags.linking_verb = self._is_linking_verb(word)
-
-            if next_tag and next_tag[1] == 'VERB':
-                components.verb = f"{components.verb}_{next_tag[0]}"
-                flags.verb_part_found = True
-                if next_tag[0] in components.untagged_words:
-                    components.untagged_words.remove(next_tag[0])
-
-            # Compound verb handling inside handler
-            if (prev_tag and flags.verb_found and prev_tag[1] in ['NOUN', 'NOUN,EZ', 'ADJ']
-                and prev_tag[0] not in components.complement
-                and prev_tag[0] not in components.object
-                and prev_tag[0] not in components.subject):
-
-                if flags.linking_verb:
-                    components.noun_complement = prev_tag[0]
-                    flags.noun_complement_found = True
-                    if prev_tag[0] in components.untagged_words:
-                        components.untagged_words.remove(prev_tag[0])
-                else:
-                    # Append as prefix to verb
-                    components.verb = f"{prev_tag[0]}_{components.verb}"
-                    flags.verb_part_found = True
-                    if prev_tag[0] in components.untagged_words:
-                        components.untagged_words.remove(prev_tag[0])
-
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-      
-    def _handle_subordinating_conjunction(self, word: str, prev_tag: Optional[Tuple[str, str]],
-                                        components: SentenceComponents):
-        if not prev_tag:
-            return
-
-        if prev_tag[0] in components.subject:
-            components.subject = f"{components.subject} {word}"
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-
-        elif prev_tag[0] in components.complement:
-            components.complement = f"{components.complement} {word}"
-            if word in components.untagged_words:
-                components.untagged_words.remove(word)
-        
     def _build_corrected_sentence(self, components: SentenceComponents,
                                     flags: SentenceFlags, corrected_verb: str) -> str:
         """
@@ -562,14 +628,117 @@ class PersianGrammarChecker:
    
     def correct(self, text: str) -> str:
         """Main method to correct Persian grammar in text"""
+        start = time.perf_counter()
         normalized_text = p.normalizer(text)
-        tokens = p.getwordtokens(normalized_text)
-        tags = p.tagger(tokens)
-        
+        _STAGE['normalize'].observe(time.perf_counter() - start)
+        SENTENCES.inc()
+        self.check_lexicon()
+        get_memory_budget().check()
+        cached = self.sentence_cache.get(normalized_text)
+        if cached is MISSING:
+            _SENTENCE_CACHE_MISS.inc()
+            start = time.perf_counter()
+            tokens = p.getwordtokens(normalized_text)
+            tokenized = time.perf_counter()
+            tags = p.tagger(tokens)
+            _STAGE['tokenize'].observe(tokenized - start)
+            _STAGE['tag'].observe(time.perf_counter() - tokenized)
+            cached = self._correct_tagged(tags)
+            self.sentence_cache.put(normalized_text, cached)
+        else:
+            _SENTENCE_CACHE_HIT.inc()
+        return text if cached is None else cached
+
+    def correct_batch(self, sentences: List[str], normalized: bool = False) -> List[str]:
+        """
+        Correct several sentences at once. Sentences missing from the cache
+        are tagged in a single tagger call; results are returned in input order.
+        Pass normalized=True when the sentences already went through p.normalizer.
+        """
+        if not sentences:
+            return []
+        if normalized:
+            document = Document.from_sentences(sentences)
+        else:
+            start = time.perf_counter()
+            document = Document.from_sentences([p.normalizer(text) for text in sentences])
+            _STAGE['normalize_batch'].observe(time.perf_counter() - start)
+        results = self._correct_sentences(document.sentences)
+        return [
+            text if result is None else result
+            for text, result in zip(sentences, results)
+        ]
+
+    def correct_document(self, document: Document) -> List[str]:
+        """
+        Correct every sentence of a Document, reusing the tokens and tags it
+        already holds and storing new ones (and the result) on its sentences.
+        """
+        results = self._correct_sentences(document.sentences)
+        return [
+            sentence.text if result is None else result
+            for sentence, result in zip(document.sentences, results)
+        ]
+
+    def extract_components(self, sentence: Union[str, Sentence]) -> SentenceComponents:
+        """Parse a sentence into its components without correcting it"""
+        if isinstance(sentence, str):
+            sentence = Sentence(p.normalizer(sentence))
+        components, _ = self._parse_sentence_components(sentence.get_tags())
+        return components
+
+    def _correct_sentences(self, sentences: List[Sentence]) -> List[Optional[str]]:
+        """Cache lookup, one batched tagger pass for the misses, then per-sentence correction"""
+        SENTENCES.inc(len(sentences))
+        self.check_lexicon()
+        get_memory_budget().check()
+        results = {}
+        pending = []
+        for sentence in sentences:
+            key = sentence.text
+            if key in results:
+                continue
+            cached = self.sentence_cache.get(key)
+            if cached is MISSING:
+                results[key] = None
+                pending.append(sentence)
+            else:
+                results[key] = cached
+        _SENTENCE_CACHE_MISS.inc(len(pending))
+        _SENTENCE_CACHE_HIT.inc(len(sentences) - len(pending))
+
+        if pending:
+            untagged = [sentence for sentence in pending if sentence.tags is None]
+            if untagged:
+                start = time.perf_counter()
+                token_lists = [sentence.get_tokens() for sentence in untagged]
+                tokenized = time.perf_counter()
+                tagged = p.tagger_sents(token_lists)
+                _STAGE['tokenize_batch'].observe(tokenized - start)
+                _STAGE['tag_batch'].observe(time.perf_counter() - tokenized)
+                for sentence, tags in zip(untagged, tagged):
+                    sentence.tags = tags
+            for sentence in pending:
+                results[sentence.text] = self._correct_tagged(sentence.tags)
+                self.sentence_cache.put(sentence.text, results[sentence.text])
+
+        for sentence in sentences:
+            sentence.corrected = results[sentence.text]
+        return [results[sentence.text] for sentence in sentences]
+
+    def _correct_tagged(self, tags: List[Tuple[str, str]]) -> Optional[str]:
+        """
+        Run parsing, verb analysis and reconstruction on a tagged sentence.
+        Returns None when the sentence should be left unchanged.
+        """
+        start = time.perf_counter()
         components, flags = self._parse_sentence_components(tags)
+        parsed = time.perf_counter()
+        _STAGE['parse'].observe(parsed - start)
         
         if not flags.verb_found:
-            return text
+            _UNCHANGED_NO_VERB.inc()
+            return None
         
         verb_full = components.verb
         
@@ -583,30 +752,24 @@ class PersianGrammarChecker:
             noun_part = ""
             conjugatable_part = verb_full
         
-        # Get Lemma
-        lemma_full = p.lemmatizer(conjugatable_part)
-        lemma_root = lemma_full.split('#')[0]
-        
-        # Analyze Properties
-        verb_props = self._analyze_verb_properties(
-            conjugatable_part, lemma_full, flags.linking_verb, flags.verb_part_found, noun_part
+        analysis = self._analyze_verb(
+            conjugatable_part, noun_part, flags.linking_verb, flags.verb_part_found
         )
-        
-        tense = verb_props.to_tense()
-        if not tense:
-            return text
-        
-        # Clean the stem before conjugation (remove prefixes like 'mi', 'nemi')
-        clean_root = lemma_root 
-        if verb_props.is_present and '#' in lemma_full:
-            clean_root = lemma_full.split('#')[1]
-        
+        analyzed = time.perf_counter()
+        _STAGE['verb'].observe(analyzed - parsed)
+        if not analysis.tense:
+            _UNCHANGED_NO_TENSE.inc()
+            return None
+
+        clean_root = analysis.clean_root
         # Special case: Linking verbs plural correction (Ast -> Hastand)
         if flags.linking_verb and flags.subject_is_plural and clean_root == 'است':
             clean_root = 'هست'
 
         # Conjugate
-        verb_list = p.conjugation(clean_root, tense)
+        verb_list = self.verb_cache.conjugate(analysis, clean_root)
+        conjugated = time.perf_counter()
+        _STAGE['conjugate'].observe(conjugated - analyzed)
 
         if verb_list:
             corrected_verb_part = self._select_correct_verb_form(
@@ -633,6 +796,7 @@ class PersianGrammarChecker:
         corrected_sentence = self._build_corrected_sentence(components, flags, corrected_verb)
         
         normalized_result = p.normalizer(corrected_sentence)
+        _STAGE['build'].observe(time.perf_counter() - conjugated)
         return normalized_result
 
 
@@ -643,6 +807,11 @@ def get_grammar_checker():
     global _grammar_checker_instance
     if _grammar_checker_instance is None:
         _grammar_checker_instance = PersianGrammarChecker()
+        # The process-wide checker's caches count against the memory budget
+        budget = get_memory_budget()
+        budget.add_cache('sentence', _grammar_checker_instance.sentence_cache)
+        budget.add_cache('word', _grammar_checker_instance.word_cache)
+        budget.add_cache('verb', _grammar_checker_instance.verb_cache)
     return _grammar_checker_instance
 
 def correction(text: str) -> str:
@@ -1,10 +1,171 @@
 from __future__ import unicode_literals
-from hazm import *
 import difflib
+import os
 import re
-from typing import Dict, List, Tuple, Optional, Any
+import threading
+import time
+from typing import Callable, Dict, List, Tuple, Optional, Any
 
 
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+TAGGER_MODEL = os.path.join(RESOURCES_DIR, 'pos_tagger.model')
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (0 if unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is a peak value in kilobytes on Linux, bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, AttributeError):
+        return 0
+
+
+class ResourceRegistry:
+    """
+    Loads hazm resources lazily, once per process, and hands them out.
+
+    Resources registered with per_thread=True (the CRF tagger, whose
+    crfsuite handle is not safe to share) get one instance per thread;
+    everything else is a single shared instance.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Tuple[Callable[[], Any], bool]] = {}
+        self._shared: Dict[str, Any] = {}
+        # Per-thread instances given up by their thread, waiting for a new owner
+        self._detached: Dict[str, Any] = {}
+        self._local = threading.local()
+        # Reentrant: a factory may get() the resources it is built from
+        self._lock = threading.RLock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        # RSS growth of loads nested in the factory running now (e.g. the
+        # hazm import inside the first component), so it is counted once
+        self._nested_rss = 0
+        # A fork (e.g. starting the engine's pool) waits for a load running on
+        # another thread; otherwise the child inherits the lock held forever
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(before=self._lock.acquire,
+                                after_in_parent=self._lock.release,
+                                after_in_child=self._lock.release)
+
+    def register(self, name: str, factory: Callable[[], Any], per_thread: bool = False):
+        with self._lock:
+            self._factories[name] = (factory, per_thread)
+            self._shared.pop(name, None)
+            self._stats[name] = {
+                'per_thread': per_thread,
+                'loads': 0,
+                'load_seconds': 0.0,
+                'rss_bytes': 0,
+            }
+
+    def _load(self, name: str) -> Any:
+        # Caller holds the lock
+        factory, _ = self._factories[name]
+        outer_nested, self._nested_rss = self._nested_rss, 0
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            instance = factory()
+        finally:
+            elapsed = time.perf_counter() - start
+            # RSS delta is approximate when other threads allocate concurrently
+            rss_delta = max(current_rss() - rss_before, 0)
+            nested, self._nested_rss = self._nested_rss, outer_nested + rss_delta
+        stats = self._stats[name]
+        stats['loads'] += 1
+        stats['load_seconds'] += elapsed
+        stats['rss_bytes'] += max(rss_delta - nested, 0)
+        return instance
+
+    def get(self, name: str) -> Any:
+        """Return the instance of a resource, loading it on first use"""
+        if name not in self._factories:
+            raise KeyError(f"Unknown resource: {name}")
+        _, per_thread = self._factories[name]
+
+        if per_thread:
+            instances = getattr(self._local, 'instances', None)
+            if instances is None:
+                instances = self._local.instances = {}
+            instance = instances.get(name)
+            if instance is None:
+                with self._lock:
+                    instance = self._detached.pop(name, None)
+                    if instance is None:
+                        instance = self._load(name)
+                instances[name] = instance
+            return instance
+
+        instance = self._shared.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._shared.get(name)
+                if instance is None:
+                    instance = self._load(name)
+                    self._shared[name] = instance
+        return instance
+
+    def preload(self, names: Optional[List[str]] = None):
+        """Load resources up front (all registered ones by default)"""
+        for name in names or list(self._factories):
+            self.get(name)
+
+    def detach_thread_instances(self):
+        """
+        Give up this thread's per-thread instances; the next thread asking
+        for one takes it over instead of loading its own. Called in a forked
+        child so a worker thread reuses the models the parent preloaded.
+        """
+        instances = getattr(self._local, 'instances', None) or {}
+        with self._lock:
+            self._detached.update(instances)
+        self._local.instances = {}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Load count, cumulative load time and approximate RSS per resource
+        (RSS excludes resources loaded by its factory; the time includes them)"""
+        with self._lock:
+            return {name: dict(values) for name, values in self._stats.items()}
+
+
+def _import_hazm():
+    # hazm's package __init__ imports every submodule (nltk, sklearn, scipy),
+    # so the import is deferred until a component is actually needed
+    import hazm
+    return hazm
+
+
+def _hazm_factory(class_name: str, **kwargs) -> Callable[[], Any]:
+    """Factory building hazm.<class_name>(**kwargs), importing hazm on first use"""
+    def factory():
+        return getattr(registry.get('hazm'), class_name)(**kwargs)
+    return factory
+
+
+def _tagger_factory():
+    # Same model as hazm.POSTagger, with per-word features cached across calls
+    registry.get('hazm')
+    from tagging import CachedPOSTagger, get_feature_cache
+    return CachedPOSTagger(TAGGER_MODEL, get_feature_cache())
+
+
+registry = ResourceRegistry()
+registry.register('hazm', _import_hazm)
+registry.register('normalizer', _hazm_factory('Normalizer'))
+registry.register('word_tokenizer', _hazm_factory('WordTokenizer'))
+registry.register('sentence_tokenizer', _hazm_factory('SentenceTokenizer'))
+registry.register('lemmatizer', _hazm_factory('Lemmatizer'))
+registry.register('stemmer', _hazm_factory('Stemmer'))
+registry.register('conjugation', _hazm_factory('Conjugation'))
+registry.register('tagger', _tagger_factory, per_thread=True)
+
 
 class SentenceTokenizer:
     """Sentence tokenizer for Persian text"""
@@ -14,7 +175,7 @@ class SentenceTokenizer:
     
     def tokenize(self, text: str) -> list:
         """Tokenize text into sentences"""
-        return sent_tokenize(text)
+        return registry.get('sentence_tokenizer').tokenize(text)
 
 class parser:
 
@@ -40,17 +201,15 @@ class parser:
     #جداسازی جملات متن
     @staticmethod
     def getsenttokens(string):
-        return sent_tokenize(string)
+        return registry.get('sentence_tokenizer').tokenize(string)
     
     #گرفتن توکن‌های ‌جمله
     @staticmethod
     def getwordtokens(string):
-        tokenizer = WordTokenizer()
-        return tokenizer.tokenize(string)
+        return registry.get('word_tokenizer').tokenize(string)
     
     def join(part1,part2):
-        tokenizer = WordTokenizer()
-        return tokenizer.join_verb_parts([part1 , part2])
+        return registry.get('word_tokenizer').join_verb_parts([part1 , part2])
 
     #گرفتن توکن بعدی
     @staticmethod
@@ -62,35 +221,36 @@ class parser:
     #نرمال‌سازی جمله
     @staticmethod
     def normalizer(string):
-        normalizer = Normalizer()
-        return normalizer.normalize(string)
+        return registry.get('normalizer').normalize(string)
     
     #یافتن اجزای جمله
     @staticmethod
     def tagger(token):
-        tagger = POSTagger(model='resources/pos_tagger.model')
-        return tagger.tag(token)
+        return registry.get('tagger').tag(token)
+
+    #برچسب‌گذاری چند جمله در یک فراخوانی
+    @staticmethod
+    def tagger_sents(sentences):
+        return registry.get('tagger').tag_sents(sentences)
 
 
     #یافتن بن فعل
     @staticmethod
     def lemmatizer(word):
-        lemmatizer = Lemmatizer()
         if word:
-            return lemmatizer.lemmatize(word)
+            return registry.get('lemmatizer').lemmatize(word)
         else:
             return ""
         
     #ریشه‌یابی کلمات
     @staticmethod
     def stemmer(string):
-        stemmer = Stemmer()
-        return stemmer.stem(string)
+        return registry.get('stemmer').stem(string)
     
     #صرف فعل ها با گرفتن بن فعل و زمان آن
     @staticmethod
     def conjugation(verb,tense):
-        conj = Conjugation()
+        conj = registry.get('conjugation')
         match tense:
 
             #صرف فعل گذشته ساده
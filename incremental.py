@@ -0,0 +1,159 @@
+from caching import SentenceCache, MISSING
+from document import Document
+from hazm_methods import SentenceTokenizer
+from lexicon import LexiconStore, get_lexicon_store
+from memory import get_memory_budget
+from metrics import CACHE_LOOKUPS
+from pipeline import Stage
+from typing import Callable, List, Optional, Tuple
+from dataclasses import dataclass, field
+import hashlib
+import time
+
+_LINE_CACHE_HIT = CACHE_LOOKUPS.labels('line', 'hit')
+_LINE_CACHE_MISS = CACHE_LOOKUPS.labels('line', 'miss')
+
+
+def line_hash(line: str) -> str:
+    """Hash of a stripped input line, used as the cache key and sent to clients"""
+    return hashlib.blake2b(line.strip().encode('utf-8'), digest_size=16).hexdigest()
+
+
+@dataclass
+class CheckedLine:
+    """One non-blank input line with its (original, corrected) sentence pairs"""
+    hash: str
+    pairs: Tuple[Tuple[str, str], ...]
+    rechecked: bool
+
+
+@dataclass
+class RecheckResult:
+    lines: List[CheckedLine] = field(default_factory=list)
+    # Time spent splitting and correcting the rechecked lines (these
+    # overlap when the lines were split on a Stage)
+    split_seconds: float = 0.0
+    correct_seconds: float = 0.0
+
+    @property
+    def sentence_pairs(self) -> List[Tuple[str, str]]:
+        return [pair for line in self.lines for pair in line.pairs]
+
+    @property
+    def rechecked_pairs(self) -> List[Tuple[str, str]]:
+        return [pair for line in self.lines if line.rechecked for pair in line.pairs]
+
+    @property
+    def corrected_text(self) -> str:
+        return '\n'.join(corrected for _, corrected in self.sentence_pairs)
+
+
+class IncrementalChecker:
+    """
+    Re-checks a document by line. Each non-blank line is hashed; lines seen
+    before reuse their sentences and corrections, and only new or edited
+    lines are normalized, split and corrected (in one `correct` call).
+    Sentence splitting is per line, so reusing whole lines gives exactly
+    the result of checking the full text.
+
+    When at least `overlap_lines` lines are new (None: never), they are
+    split on a background Stage and corrected in chunks of about
+    `chunk_size` sentences as they come, so splitting overlaps with
+    correction. That only pays off when `correct` runs outside this
+    process, e.g. on an engine with worker processes.
+
+    `correct` takes normalized sentences and returns their corrections,
+    e.g. BatchScheduler.correct with normalized=True. The line cache is
+    cleared when `lexicon_store` (default: the process-wide one) reloads
+    the word lists, like the checker's caches.
+    """
+
+    def __init__(self, correct: Callable[[List[str]], List[str]],
+                 max_lines: int = 100000, max_bytes: Optional[int] = 64 * 1024 * 1024,
+                 sentence_tokenizer: Optional[SentenceTokenizer] = None,
+                 chunk_size: int = 256, overlap_lines: Optional[int] = 64,
+                 queue_size: int = 1024,
+                 lexicon_store: Optional[LexiconStore] = None):
+        self.correct = correct
+        self.chunk_size = chunk_size
+        self.overlap_lines = overlap_lines
+        self.queue_size = queue_size
+        self.sentence_tokenizer = sentence_tokenizer or SentenceTokenizer()
+        self.lines = SentenceCache(max_lines, max_bytes,
+                                   lexicon_store=lexicon_store or get_lexicon_store())
+
+    def check(self, text: str) -> RecheckResult:
+        self.lines.check_lexicon()
+        get_memory_budget().check()
+        result = RecheckResult()
+        missed = {}
+        misses = 0
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            key = line_hash(line)
+            pairs = self.lines.get(key)
+            if pairs is MISSING:
+                # A line repeated within the text is corrected once
+                missed.setdefault(key, line)
+                misses += 1
+                result.lines.append(CheckedLine(key, (), True))
+            else:
+                result.lines.append(CheckedLine(key, pairs, False))
+        _LINE_CACHE_MISS.inc(misses)
+        _LINE_CACHE_HIT.inc(len(result.lines) - misses)
+
+        if missed:
+            if self.overlap_lines is not None and len(missed) >= self.overlap_lines:
+                fresh = self._correct_overlapped(missed, result)
+            else:
+                start = time.perf_counter()
+                per_line = [(key, self._split(line)) for key, line in missed.items()]
+                result.split_seconds = time.perf_counter() - start
+                fresh = self._correct_lines(per_line, result)
+            seen = set()
+            for line in result.lines:
+                if line.rechecked:
+                    line.pairs = fresh[line.hash]
+                    # Later copies of a repeated new line count as reused
+                    line.rechecked = line.hash not in seen
+                    seen.add(line.hash)
+        return result
+
+    def _split(self, line: str) -> List[str]:
+        return Document.from_text(line, self.sentence_tokenizer).texts
+
+    def _correct_lines(self, per_line: List[Tuple[str, List[str]]], result: RecheckResult) -> dict:
+        """Correct the sentences of some split lines in one call and cache them by line"""
+        start = time.perf_counter()
+        corrected = self.correct([sentence for _, sentences in per_line for sentence in sentences])
+        result.correct_seconds += time.perf_counter() - start
+        fresh = {}
+        offset = 0
+        for key, sentences in per_line:
+            fresh[key] = tuple(zip(sentences, corrected[offset:offset + len(sentences)]))
+            offset += len(sentences)
+            self.lines.put(key, fresh[key])
+        return fresh
+
+    def _correct_overlapped(self, missed: dict, result: RecheckResult) -> dict:
+        # Lines are kept whole within a chunk so each one is cached at once
+        split = Stage('recheck_split', ((key, self._split(line)) for key, line in missed.items()),
+                      self.queue_size)
+        fresh = {}
+        chunk = []
+        size = 0
+        for key, sentences in split:
+            chunk.append((key, sentences))
+            size += len(sentences)
+            if size >= self.chunk_size:
+                fresh.update(self._correct_lines(chunk, result))
+                chunk = []
+                size = 0
+        if chunk:
+            fresh.update(self._correct_lines(chunk, result))
+        result.split_seconds = split.producer_seconds
+        return fresh
+
+    def stats(self) -> dict:
+        return self.lines.stats()
@@ -0,0 +1,325 @@
+from engine import CorrectionEngine
+from hazm_methods import SentenceTokenizer
+from pipeline import iter_sentences, stream_corrections
+from typing import Iterator, List, Optional, Tuple
+import itertools
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    input TEXT NOT NULL,
+    total INTEGER,
+    done INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    owner TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    updated REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    original TEXT NOT NULL,
+    corrected TEXT NOT NULL,
+    PRIMARY KEY (job_id, idx)
+) WITHOUT ROWID;
+"""
+
+# Columns returned by JobStore.get
+JOB_FIELDS = ('id', 'status', 'total', 'done', 'error', 'created', 'started', 'updated', 'finished')
+
+
+def job_progress(job: dict) -> Optional[float]:
+    """Sentences done out of total for a job from JobStore.get, or None while the total is unknown"""
+    if job['total']:
+        return job['done'] / job['total']
+    return 1.0 if job['status'] == 'finished' else None
+
+
+class JobStore:
+    """
+    SQLite store for correction jobs and their per-sentence results.
+
+    Each thread gets its own connection; the database is in WAL mode so
+    readers (status polls, downloads) do not block the job workers, and
+    several processes (e.g. serve.py workers) can share one file.
+    """
+
+    def __init__(self, path: str = 'jobs.sqlite3', timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def create(self, text: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, input, created, updated) VALUES (?, 'queued', ?, ?, ?)",
+            (job_id, text, now, now))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._connect().execute(
+            f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(JOB_FIELDS, row)) if row else None
+
+    def claim(self, owner: str, stale_after: float) -> Optional[Tuple[str, str, int]]:
+        """
+        Atomically take the oldest queued job, or a running one whose owner
+        stopped updating it (a crashed or restarted process). Jobs `owner`
+        itself runs are never taken back. Returns (id, input, sentences
+        already done) or None.
+        """
+        db = self._connect()
+        now = time.time()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute(
+                "SELECT id, input, done FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND updated < ? AND owner IS NOT ?) ORDER BY created LIMIT 1",
+                (now - stale_after, owner)).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, updated = ?, "
+                    "started = COALESCE(started, ?) WHERE id = ?",
+                    (owner, now, now, row[0]))
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return row
+
+    def touch(self, owner: str, job_ids: List[str]):
+        """Mark running jobs of `owner` as alive, so no other process claims them"""
+        now = time.time()
+        self._connect().executemany(
+            "UPDATE jobs SET updated = ? WHERE id = ? AND owner = ? AND status = 'running'",
+            [(now, job_id, owner) for job_id in job_ids])
+
+    def set_total(self, job_id: str, total: int):
+        self._connect().execute(
+            "UPDATE jobs SET total = ?, updated = ? WHERE id = ?", (total, time.time(), job_id))
+
+    def add_results(self, job_id: str, start: int, pairs: List[Tuple[str, str]]):
+        """Store results from sentence `start` on and advance the progress, in one transaction"""
+        db = self._connect()
+        db.execute('BEGIN')
+        try:
+            db.executemany(
+                "INSERT OR REPLACE INTO results (job_id, idx, original, corrected) VALUES (?, ?, ?, ?)",
+                [(job_id, start + i, original, corrected) for i, (original, corrected) in enumerate(pairs)])
+            db.execute("UPDATE jobs SET done = ?, updated = ? WHERE id = ?",
+                       (start + len(pairs), time.time(), job_id))
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+    def release(self, job_id: str):
+        """Put a running job back in the queue (its progress is kept)"""
+        self._connect().execute(
+            "UPDATE jobs SET status = 'queued', owner = NULL, updated = ? WHERE id = ?",
+            (time.time(), job_id))
+
+    def finish(self, job_id: str, error: Optional[str] = None):
+        now = time.time()
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, error = ?, updated = ?, finished = ? WHERE id = ?",
+            ('failed' if error else 'finished', error, now, now, job_id))
+
+    def iter_results(self, job_id: str, batch_size: int = 1000) -> Iterator[Tuple[str, str]]:
+        """(original, corrected) pairs in input order, read in pages"""
+        db = self._connect()
+        idx = -1
+        while True:
+            rows = db.execute(
+                "SELECT idx, original, corrected FROM results WHERE job_id = ? AND idx > ? "
+                "ORDER BY idx LIMIT ?", (job_id, idx, batch_size)).fetchall()
+            if not rows:
+                return
+            for idx, original, corrected in rows:
+                yield original, corrected
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished or failed jobs that ended more than `older_than` seconds ago"""
+        db = self._connect()
+        cutoff = time.time() - older_than
+        db.execute('BEGIN')
+        try:
+            ids = [row[0] for row in db.execute(
+                "SELECT id FROM jobs WHERE status IN ('finished', 'failed') AND finished < ?",
+                (cutoff,))]
+            db.executemany("DELETE FROM results WHERE job_id = ?", [(i,) for i in ids])
+            db.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in ids])
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return len(ids)
+
+    def counts(self) -> dict:
+        return dict(self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+
+class JobQueue:
+    """
+    Runs stored jobs on `workers` background threads. A job's text is first
+    split into sentences, which sets its total, then corrected through
+    stream_corrections on the engine; results are committed every
+    `batch_size` sentences together with the progress, so a job picked up
+    again after a restart resumes where it stopped.
+    A heartbeat thread marks the running jobs as alive every
+    `stale_after / 4` seconds, however long a batch takes. Finished jobs
+    are purged after `retention` seconds.
+    """
+
+    def __init__(self, store: JobStore, engine: CorrectionEngine, workers: int = 2,
+                 batch_size: int = 256, poll_interval: float = 1.0,
+                 stale_after: float = 120.0, retention: float = 7 * 24 * 3600):
+        self.store = store
+        self.engine = engine
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.retention = retention
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wakeup = threading.Condition()
+        self._closed = False
+        # Jobs this queue is running, kept alive by the heartbeat
+        self._running = set()
+        self._running_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+        for thread in self._threads:
+            thread.start()
+        self._heartbeat.start()
+
+    def submit(self, text: str) -> str:
+        """Store a new job and wake a worker; returns the job ID"""
+        if self._closed:
+            raise RuntimeError("JobQueue is closed")
+        job_id = self.store.create(text)
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def close(self):
+        """Stop the workers; running jobs keep their progress and go back in the queue"""
+        self._closed = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._heartbeat.join()
+
+    def _beat(self):
+        while not self._closed:
+            with self._wakeup:
+                self._wakeup.wait(self.stale_after / 4)
+            with self._running_lock:
+                running = list(self._running)
+            if running and not self._closed:
+                try:
+                    self.store.touch(self.owner, running)
+                except sqlite3.Error as e:
+                    print(f"Job heartbeat failed: {e}")
+
+    def _run(self):
+        next_purge = 0.0
+        # Nothing can be corrected once the engine is shut down
+        while not self._closed and not self.engine.closed:
+            try:
+                if time.monotonic() >= next_purge:
+                    self.store.purge(self.retention)
+                    next_purge = time.monotonic() + 3600
+                job = self.store.claim(self.owner, self.stale_after)
+            except sqlite3.Error as e:
+                # e.g. "database is locked" by another process; try again later
+                print(f"Job queue failed to read the store: {e}")
+                job = None
+            if job is None:
+                # Other processes may add jobs too, so poll as well as wait
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            with self._running_lock:
+                self._running.add(job[0])
+            try:
+                self._run_job(*job)
+            finally:
+                with self._running_lock:
+                    self._running.discard(job[0])
+
+    def _run_job(self, job_id: str, text: str, done: int):
+        try:
+            # Split to the end first, so progress has a total while correcting
+            sentences = []
+            for sentence in iter_sentences(text.splitlines(), SentenceTokenizer()):
+                if self._closed:
+                    self.store.release(job_id)
+                    return
+                sentences.append(sentence)
+            self.store.set_total(job_id, len(sentences))
+            pending = []
+            start = done
+            # Sentences committed before a restart are not corrected again
+            for pair in stream_corrections(itertools.islice(sentences, done, None), self.engine,
+                                           self.batch_size, normalized=True):
+                pending.append(pair)
+                if len(pending) >= self.batch_size:
+                    self.store.add_results(job_id, start, pending)
+                    start += len(pending)
+                    pending = []
+                if self._closed:
+                    # Shutting down: keep what is done and hand the rest back
+                    if pending:
+                        self.store.add_results(job_id, start, pending)
+                    self.store.release(job_id)
+                    return
+            if pending:
+                self.store.add_results(job_id, start, pending)
+            self.store.finish(job_id)
+        except Exception as e:
+            if self._engine_stopped(e):
+                # Not the job's fault: hand it back, and take no more jobs
+                self._closed = True
+                self.store.release(job_id)
+                return
+            print(f"Job {job_id} failed: {e}")
+            self.store.finish(job_id, error=str(e))
+
+    def _engine_stopped(self, error: Exception) -> bool:
+        """
+        Whether `error` comes from the engine shutting down. At interpreter
+        exit concurrent.futures stops the process pool before any atexit
+        hook, so close() can come too late to stop the job first. Any other
+        error fails the job, even while closing, so it is not retried forever.
+        """
+        return (self.engine.closed
+                or (isinstance(error, RuntimeError) and 'after shutdown' in str(error)))
+
+    def stats(self) -> dict:
+        return {'workers': len(self._threads), 'jobs': self.store.counts()}
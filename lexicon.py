@@ -0,0 +1,352 @@
+"""
+Word lists used by the grammar checker, compiled into one binary file.
+
+Every list has a source file in resources/ (one word per line) and
+built-in words used when that file is missing. The lists are compiled
+into resources/lexicon.bin, which is memory-mapped read-only, so loading
+parses nothing and forked processes share its pages.
+
+Layout (native byte order, recorded in the header):
+
+    b'GECLEX01'  magic
+    uint32       length of the JSON header
+    JSON         {"byteorder", "signature", "lists": {name: [offset, count]}}
+    per list, at a 4-byte aligned offset:
+        uint32[count + 1]   end offsets of the words in the blob
+        bytes               the words, UTF-8, sorted bytewise
+
+The file is rebuilt when a source file's (mtime, size) no longer matches
+the signature in its header. LexiconStore.check() does that at most once
+every `check_interval` seconds and swaps the new lexicon in as a whole.
+
+    python lexicon.py            # compile and print the list sizes
+"""
+from hazm_methods import RESOURCES_DIR
+from memory import get_memory_budget
+from typing import Dict, Iterator, Optional, Tuple
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+
+MAGIC = b'GECLEX01'
+COMPILED_NAME = 'lexicon.bin'
+
+# name -> (source file in resources/, words used when the file is missing)
+SOURCES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'linking_verbs': ('LinkingVerbs.txt', (
+        'است', 'بود', 'شد', 'هست', 'نیست', 'باش', 'بودن')),
+    'adverbs': ('adverbs.txt', (
+        'دیروز', 'امروز', 'فردا', 'خوب', 'بد', 'سریع', 'آهسته', 'همیشه', 'هرگز', 'زود')),
+    # Singular nouns ending in 'ان' that would otherwise look plural
+    'singular_exceptions': ('singular_exceptions.txt', (
+        'باران', 'تهران', 'ایران', 'آسمان', 'زمستان', 'تابستان',
+        'داستان', 'دندان', 'زبان', 'جهان', 'جان', 'نان', 'لیوان',
+        'کیهان', 'طوفان', 'جریان', 'درمان', 'فرمان', 'خیابان',
+        'بیابان', 'کوهستان', 'دبیرستان', 'بیمارستان', 'استان')),
+    # Compound verbs that use 'dashtan' (to have) as a root but are NOT progressive auxiliary
+    'non_progressive_compounds': ('non_progressive_compounds.txt', (
+        'دوست', 'احتمال', 'نیاز', 'انتظار', 'خبر', 'باور', 'یاد')),
+}
+
+
+def sources_signature(resources_dir: str = RESOURCES_DIR) -> Dict[str, Optional[list]]:
+    """[mtime_ns, size] of each source file, None for a missing one"""
+    signature = {}
+    for name, (filename, _) in SOURCES.items():
+        try:
+            st = os.stat(os.path.join(resources_dir, filename))
+        except OSError:
+            signature[name] = None
+            continue
+        signature[name] = [st.st_mtime_ns, st.st_size]
+    return signature
+
+
+def read_source(name: str, resources_dir: str = RESOURCES_DIR) -> Tuple[str, ...]:
+    filename, default = SOURCES[name]
+    try:
+        with open(os.path.join(resources_dir, filename), 'r', encoding='utf-8') as f:
+            return tuple(line.strip() for line in f if line.strip())
+    except FileNotFoundError:
+        return default
+
+
+def compile_lexicon(resources_dir: str = RESOURCES_DIR) -> bytes:
+    """Build the binary lexicon from the source files"""
+    # Taken first: a file edited while we read it is compiled again next check
+    signature = sources_signature(resources_dir)
+    blocks = {}
+    for name in SOURCES:
+        words = sorted({word.encode('utf-8') for word in read_source(name, resources_dir)})
+        ends = []
+        end = 0
+        for word in words:
+            end += len(word)
+            ends.append(end)
+        blocks[name] = (len(words), struct.pack(f'={len(ends) + 1}I', 0, *ends) + b''.join(words))
+
+    # The header holds the block offsets, which depend on the header's own
+    # length; lay out against a generous guess and grow it until it fits
+    header_size = 256
+    while True:
+        offset = _align(len(MAGIC) + 4 + header_size)
+        lists = {}
+        for name, (count, block) in blocks.items():
+            lists[name] = [offset, count]
+            offset = _align(offset + len(block))
+        header = json.dumps({'byteorder': sys.byteorder, 'signature': signature, 'lists': lists},
+                            ensure_ascii=False).encode('utf-8')
+        if len(header) <= header_size:
+            break
+        header_size = len(header)
+
+    out = bytearray(MAGIC + struct.pack('=I', header_size) + header.ljust(header_size))
+    for name, (_, block) in blocks.items():
+        out.extend(b'\0' * (lists[name][0] - len(out)))
+        out.extend(block)
+    return bytes(out)
+
+
+def _align(offset: int) -> int:
+    return (offset + 3) & ~3
+
+
+def write_atomic(path: str, data: bytes):
+    """Write to a temporary file next to `path` and rename it over `path`"""
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path), dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates the file private to its owner
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class WordList:
+    """
+    One compiled, sorted word list, read in place from the lexicon buffer.
+    `word in words` is a binary search; iteration yields words in order.
+    """
+
+    __slots__ = ('name', '_ends', '_blob', '_count')
+
+    def __init__(self, name: str, buffer: memoryview, offset: int, count: int):
+        self.name = name
+        self._count = count
+        self._ends = buffer[offset:offset + 4 * (count + 1)].cast('I')
+        self._blob = buffer[offset + 4 * (count + 1):offset + 4 * (count + 1) + self._ends[count]]
+
+    def _word(self, index: int) -> bytes:
+        return bytes(self._blob[self._ends[index]:self._ends[index + 1]])
+
+    def __contains__(self, word) -> bool:
+        if not isinstance(word, str):
+            return False
+        key = word.encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._word(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low < self._count and self._word(low) == key
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._word(index).decode('utf-8')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"WordList({self.name!r}, {self._count} words)"
+
+
+class Lexicon:
+    """All word lists of one compiled build; immutable once loaded"""
+
+    def __init__(self, data, header: dict, path: Optional[str] = None):
+        # `data` is an mmap of the compiled file, or bytes compiled in memory
+        self._data = data
+        self.path = path
+        # Source (mtime, size) it was compiled from, as sources_signature()
+        self.signature = header['signature']
+        buffer = memoryview(data)
+        self.lists = {
+            name: WordList(name, buffer, offset, count)
+            for name, (offset, count) in header['lists'].items()
+        }
+
+    @property
+    def mapped(self) -> bool:
+        return isinstance(self._data, mmap.mmap)
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, name: str) -> WordList:
+        return self.lists[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.lists
+
+
+def read_header(data) -> Optional[dict]:
+    """Header of a compiled lexicon, or None if `data` is not a usable one"""
+    if len(data) < len(MAGIC) + 4 or data[:len(MAGIC)] != MAGIC:
+        return None
+    header_size, = struct.unpack_from('=I', data, len(MAGIC))
+    try:
+        header = json.loads(bytes(data[len(MAGIC) + 4:len(MAGIC) + 4 + header_size]))
+    except ValueError:
+        return None
+    if header.get('byteorder') != sys.byteorder or set(header.get('lists', ())) != set(SOURCES):
+        return None
+    return header
+
+
+def load_lexicon(resources_dir: str = RESOURCES_DIR, path: Optional[str] = None) -> Lexicon:
+    """
+    Map the compiled lexicon at `path` (default resources/lexicon.bin),
+    compiling it first if it is missing or older than its sources. If
+    the file cannot be written (a read-only install), the lexicon is
+    compiled in memory instead.
+    """
+    path = path or os.path.join(resources_dir, COMPILED_NAME)
+    try:
+        data = _map(path)
+        header = read_header(data)
+        if header is not None and header['signature'] == sources_signature(resources_dir):
+            return Lexicon(data, header, path)
+        data.close()
+    except (OSError, ValueError):
+        # Missing, empty (mmap refuses size 0) or unreadable: compile it
+        pass
+
+    data = compile_lexicon(resources_dir)
+    try:
+        write_atomic(path, data)
+        # Another process may have replaced it meanwhile, with lists as new
+        mapped = _map(path)
+        header = read_header(mapped)
+        if header is not None:
+            return Lexicon(mapped, header, path)
+        mapped.close()
+    except (OSError, ValueError) as e:
+        print(f"Could not write compiled lexicon '{path}': {e}")
+    return Lexicon(data, read_header(data))
+
+
+def _map(path: str) -> mmap.mmap:
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class LexiconStore:
+    """
+    Holds the current Lexicon and replaces it when a source file changes.
+    Readers take `store.lexicon` and keep using that object; a reload
+    builds a complete new Lexicon and swaps the reference, so no reader
+    sees a half-updated set of lists. `generation` goes up on each swap.
+    """
+
+    def __init__(self, resources_dir: str = RESOURCES_DIR, path: Optional[str] = None,
+                 check_interval: float = 1.0):
+        self.resources_dir = resources_dir
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.reloads = 0
+        self.load_seconds = 0.0
+        self.lexicon = self._load()
+        self._next_check = time.monotonic() + check_interval
+
+    def _load(self) -> Lexicon:
+        start = time.perf_counter()
+        lexicon = load_lexicon(self.resources_dir, self.path)
+        self.load_seconds = time.perf_counter() - start
+        return lexicon
+
+    def check(self) -> bool:
+        """Reload if a source file changed; True if a new lexicon was swapped in"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval
+            if sources_signature(self.resources_dir) == self.lexicon.signature:
+                return False
+            return self._swap()
+
+    def reload(self) -> bool:
+        """Rebuild from the sources now, whether or not they changed"""
+        with self._lock:
+            return self._swap()
+
+    def _swap(self) -> bool:
+        # Caller holds the lock
+        try:
+            lexicon = self._load()
+        except Exception as e:
+            # Keep serving the lists we have; a later check tries again
+            print(f"Lexicon reload failed: {e}")
+            return False
+        self.lexicon = lexicon
+        self.generation += 1
+        self.reloads += 1
+        return True
+
+    def stats(self) -> dict:
+        lexicon = self.lexicon
+        return {
+            'generation': self.generation,
+            'reloads': self.reloads,
+            'path': lexicon.path,
+            'mapped': lexicon.mapped,
+            'bytes': lexicon.size,
+            'load_seconds': self.load_seconds,
+            'words': {name: len(words) for name, words in lexicon.lists.items()},
+        }
+
+
+# Singleton instance
+_lexicon_store = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon_store() -> LexiconStore:
+    global _lexicon_store
+    if _lexicon_store is None:
+        with _lexicon_lock:
+            if _lexicon_store is None:
+                _lexicon_store = LexiconStore()
+                store = _lexicon_store
+                # Mapped pages are shared by forked workers; counted in each
+                get_memory_budget().add_component('lexicon', lambda: store.lexicon.size)
+    return _lexicon_store
+
+
+if __name__ == '__main__':
+    store = LexiconStore()
+    stats = store.stats()
+    print(f"{stats['path'] or '(in memory)'}: {stats['bytes']} bytes, "
+          f"loaded in {stats['load_seconds'] * 1000:.2f} ms")
+    for name, count in stats['words'].items():
+        print(f"  {name:<28}{count:>6} words")
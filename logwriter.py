@@ -0,0 +1,219 @@
+from typing import List, Optional
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+
+FSYNC_POLICIES = ('never', 'batch', 'interval')
+
+# Queue marker asking the writer thread to write out what it has and report back
+_FLUSH = object()
+
+
+class LogWriter:
+    """
+    Appends JSON-lines log entries from a single background thread.
+
+    Callers enqueue entries on a bounded queue (blocking when it is full);
+    the writer groups them into batches and appends each batch with one
+    write() on an O_APPEND descriptor under an exclusive file lock, so
+    lines stay whole when several processes share the file. Optional
+    size-based rotation keeps `backup_count` old files, gzipped if
+    `compress` is set.
+
+    fsync policy: 'never' leaves syncing to the OS, 'batch' syncs after
+    every batch, 'interval' at most once every `fsync_interval` seconds.
+    """
+
+    def __init__(self, path: str = "log.json", max_queue: int = 10000,
+                 batch_size: int = 512, flush_interval: float = 0.5,
+                 fsync: str = 'never', fsync_interval: float = 5.0,
+                 max_bytes: Optional[int] = None, backup_count: int = 5,
+                 compress: bool = False):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.rotations = 0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._fd: Optional[int] = None
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, entries: List[dict]):
+        """Queue log entries for writing (blocks while the queue is full)"""
+        if self._closed:
+            raise RuntimeError("LogWriter is closed")
+        for entry in entries:
+            self._queue.put(entry)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is written"""
+        if self._closed:
+            # close() has already written out everything
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        # Release flush() calls that queued their marker behind the stop marker
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, tuple) and item[0] is _FLUSH:
+                item[1].set()
+
+    def stats(self) -> dict:
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'errors': self.errors,
+            'rotations': self.rotations,
+        }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            lines = []
+            waiters = []
+            while True:
+                if item is None:
+                    stopping = True
+                elif isinstance(item, tuple) and item[0] is _FLUSH:
+                    waiters.append(item[1])
+                else:
+                    lines.append(json.dumps(item, ensure_ascii=False) + "\n")
+                if stopping or len(lines) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if lines:
+                self._write_batch(''.join(lines).encode('utf-8'), len(lines))
+            for waiter in waiters:
+                waiter.set()
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _open(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _write_batch(self, data: bytes, count: int):
+        try:
+            if self._fd is None:
+                self._open()
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._reopen_if_rotated()
+                if self.max_bytes and os.fstat(self._fd).st_size + len(data) > self.max_bytes:
+                    self._rotate()
+                os.write(self._fd, data)
+                self._maybe_fsync()
+            finally:
+                if fcntl is not None and self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self.written += count
+            self.batches += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"Error writing to log file: {e}")
+
+    def _reopen_if_rotated(self):
+        """Another process may have rotated the file since we opened it"""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            current = None
+        if current is None or current.st_ino != os.fstat(self._fd).st_ino:
+            locked = self._fd
+            self._fd = None
+            self._open()
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+                fcntl.flock(locked, fcntl.LOCK_UN)
+            os.close(locked)
+
+    def _backup_name(self, index: int) -> str:
+        return f"{self.path}.{index}" + (".gz" if self.compress else "")
+
+    def _rotate(self):
+        # Called with the lock held on the current file
+        if os.fstat(self._fd).st_size == 0:
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self._backup_name(index)
+            if os.path.exists(source):
+                os.replace(source, self._backup_name(index + 1))
+        rotated = f"{self.path}.1"
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, 'rb') as src, gzip.open(rotated + ".gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        self._reopen_if_rotated()
+        self.rotations += 1
+
+    def _maybe_fsync(self):
+        if self.fsync == 'batch':
+            os.fsync(self._fd)
+        elif self.fsync == 'interval':
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._fd)
+                self._last_fsync = now
+
+
+# Shared instance for the default log
+_log_writer_instance = None
+
+
+def get_log_writer(path: str = "log.json") -> LogWriter:
+    global _log_writer_instance
+    if _log_writer_instance is None:
+        _log_writer_instance = LogWriter(path)
+        atexit.register(_log_writer_instance.close)
+    return _log_writer_instance
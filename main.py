@@ -1,61 +1,85 @@
-from grammarchecker import PersianGrammarChecker
-from hazm_methods import parser as p, SentenceTokenizer
-from hazm import Normalizer
-import concurrent.futures
-import json
-
-
-#objects
-try:
-    file = open("sample_text.txt", "r", encoding="utf-8")
-    print("File 'sample_text.txt' opened successfully.")
-except Exception as e:
-    print(f"Error opening file 'sample_text.txt': {e}")
-    file = None
-
-# Initialize normalizer, grammar checker and sentence tokenizer
-normalizer = Normalizer()
-gc = PersianGrammarChecker()
-sentence_tokenizer = SentenceTokenizer()
-
-if file is None:
-    print("Error: Could not open file")
-    exit(1)
-
-text = file.readlines()
-
-# Collect all sentences into a list
-all_sentences = []
-for line in text:
-    normalized_line = normalizer.normalize(line.strip())
-    sentences = sentence_tokenizer.tokenize(normalized_line)
-    for sentence in sentences:
-        if sentence.strip():  # Skip empty sentences
-            all_sentences.append(sentence.strip())
-
-# Process sentences in parallel using ThreadPoolExecutor
-def process_sentence(sentence):
-    corrected_line = gc.correct(sentence)
-    return {
-        "corrected": corrected_line,
-        "original": sentence
-    }
-
-# Use ThreadPoolExecutor to process sentences in parallel
-with concurrent.futures.ThreadPoolExecutor() as executor:
-    results = list(executor.map(process_sentence, all_sentences))
-
-# Write results to log.json atomically
-with open("log.json", "a", encoding="utf-8") as f:
-    for result in results:
-        f.write(json.dumps(result, ensure_ascii=False) + "\n")
-
-#بستن فایل
-try:
-    file.close()
-    print("File closed successfully.")
-except Exception as e:
-    print(f"Error closing file: {e}")
+from engine import CorrectionEngine
+from grammarchecker import get_grammar_checker
+from hazm_methods import SentenceTokenizer
+from logwriter import LogWriter
+from memory import format_report, get_memory_budget
+from pipeline import Stage, iter_sentences, split_ahead, stream_corrections
+import argparse
+import os
 
 
+def main():
+    arg_parser = argparse.ArgumentParser(description="Correct a Persian text file sentence by sentence")
+    arg_parser.add_argument('input', nargs='?', default="sample_text.txt")
+    arg_parser.add_argument('output', nargs='?', default="log.json")
+    arg_parser.add_argument('--batch-size', type=int, default=64,
+                            help="sentences sent to a worker at a time")
+    arg_parser.add_argument('--max-in-flight', type=int, default=None,
+                            help="batches being corrected at once (default: 2 per worker)")
+    arg_parser.add_argument('--queue-size', type=int, default=1024,
+                            help="split sentences waiting to be corrected")
+    arg_parser.add_argument('--memory-budget',
+                            help="RSS budget per process, e.g. 512M; caches shrink to stay under it")
+    arg_parser.add_argument('--memory-report', action='store_true',
+                            help="print memory per component and cache sizes when done")
+    args = arg_parser.parse_args()
+    if args.memory_budget:
+        # Read by each process (pool workers included) when it first checks the budget
+        os.environ['GEC_MEMORY_BUDGET'] = args.memory_budget
 
+    #objects
+    try:
+        file = open(args.input, "r", encoding="utf-8")
+        print(f"File '{args.input}' opened successfully.")
+    except Exception as e:
+        print(f"Error opening file '{args.input}': {e}")
+        file = None
+
+    # Initialize correction engine and sentence tokenizer
+    workers = int(os.environ.get('GEC_WORKERS', 0)) or None
+    engine = CorrectionEngine(workers=workers, checker=get_grammar_checker())
+    # Fork the workers before the split thread starts
+    engine.start()
+    sentence_tokenizer = SentenceTokenizer()
+
+    if file is None:
+        print("Error: Could not open file")
+        exit(1)
+
+    # Read, split and correct lazily; each result is written as soon as it
+    # is ready, in input order, so memory does not grow with the file size.
+    # With worker processes, reading and splitting run on their own thread
+    # ahead of correction
+    sentences = split_ahead('split', iter_sentences(file, sentence_tokenizer), engine, args.queue_size)
+    log_writer = LogWriter(args.output)
+    try:
+        for sentence, corrected_line in stream_corrections(
+            sentences, engine, args.batch_size, args.max_in_flight, normalized=True
+        ):
+            log_writer.write([{"corrected": corrected_line, "original": sentence}])
+    finally:
+        engine.shutdown()
+        log_writer.close()
+
+    if isinstance(sentences, Stage):
+        stats = sentences.stats()
+        print(f"Split {stats['items']} sentences in {stats['producer_seconds']:.1f} s; "
+              f"queue depth mean {stats['mean_depth']:.0f}, max {stats['max_depth']}/{args.queue_size}; "
+              f"splitter blocked {stats['producer_blocked_seconds']:.1f} s, "
+              f"corrector waiting {stats['consumer_waiting_seconds']:.1f} s")
+
+    if args.memory_report:
+        # This process only: with GEC_WORKERS > 1 the caches live in the pool workers
+        print(format_report(get_memory_budget().report()))
+
+    #بستن فایل
+    try:
+        file.close()
+        print("File closed successfully.")
+    except Exception as e:
+        print(f"Error closing file: {e}")
+
+
+# The guard keeps worker processes started with "spawn" from re-running the batch
+if __name__ == "__main__":
+    main()
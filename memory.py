@@ -0,0 +1,246 @@
+"""
+Memory accounting for one process: resident memory per component, the
+live size of every cache, and an optional budget the caches are shrunk
+to fit.
+
+Components register themselves when they are created: the grammar
+checker's sentence, word and verb caches, the tagger's feature cache,
+the compiled lexicon, and in the web app the line cache and the
+documents being processed. hazm models are reported from the resource
+registry, which records the RSS growth of each load.
+
+The budget covers the process's RSS (GEC_MEMORY_BUDGET, e.g. "512M").
+Models and the interpreter cannot shrink, so when RSS is over budget
+the caches' byte limits are cut by the excess, proportionally to their
+size, evicting least recently used entries. When RSS is back under
+`low_water` of the budget, the limits of caches that have filled up to
+them grow again, up to the limits the caches were created with.
+check() does this at most once every `check_interval` seconds. Each
+process (engine pool worker, serve.py worker) keeps its own budget.
+
+    python memory.py [--budget 512M] [--input FILE]   # warm up and print the report
+"""
+from contextlib import contextmanager
+from hazm_methods import current_rss, registry
+from typing import Any, Callable, Dict, Optional
+import os
+import re
+import threading
+import time
+
+
+_SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    """Bytes in a size such as '512M', '2G' or '1048576'"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?\s*', value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+class MemoryBudget:
+    """
+    Registry of a process's caches and memory-holding components, and
+    the budget they are kept under. A cache is anything with stats()
+    (reporting 'bytes' and 'max_bytes') and resize(max_bytes=...).
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, check_interval: float = 1.0,
+                 low_water: float = 0.9):
+        self.budget_bytes = budget_bytes
+        self.check_interval = check_interval
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        # Registered caches, and the max_bytes each was created with
+        self._caches: Dict[str, Any] = {}
+        self._configured: Dict[str, Optional[int]] = {}
+        self._components: Dict[str, Callable[[], int]] = {}
+        self._in_flight: Dict[str, list] = {}
+        self._next_check = 0.0
+        # RSS right after the last shrink; freed cache memory mostly stays
+        # in the process, so only growth past it is shrunk again
+        self._shrunk_at = 0
+        self._warned = False
+        self.shrinks = 0
+        self.grows = 0
+
+    def add_cache(self, name: str, cache):
+        with self._lock:
+            self._caches[name] = cache
+            self._configured[name] = cache.stats()['max_bytes']
+
+    def add_component(self, name: str, size: Callable[[], int]):
+        """Report `size()` bytes under `name` (e.g. a mapped file)"""
+        with self._lock:
+            self._components[name] = size
+
+    @contextmanager
+    def in_flight(self, name: str, size: int):
+        """Count `size` bytes under `name` while the block runs"""
+        with self._lock:
+            entry = self._in_flight.setdefault(name, [0, 0])
+            entry[0] += 1
+            entry[1] += size
+        try:
+            yield
+        finally:
+            with self._lock:
+                entry[0] -= 1
+                entry[1] -= size
+
+    def check(self) -> bool:
+        """Enforce the budget if it is set and due; True if a cache was resized"""
+        if self.budget_bytes is None:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval
+            return self._enforce(current_rss())
+
+    def enforce(self) -> bool:
+        """Resize the caches for the current RSS now"""
+        if self.budget_bytes is None:
+            return False
+        with self._lock:
+            return self._enforce(current_rss())
+
+    def _enforce(self, rss: int) -> bool:
+        # Caller holds the lock
+        stats = {name: cache.stats() for name, cache in self._caches.items()}
+        cached = sum(s['bytes'] for s in stats.values())
+        if rss > self.budget_bytes:
+            excess = min(rss - self.budget_bytes, rss - self._shrunk_at)
+            if excess <= 0:
+                return False
+            if not cached:
+                if not self._warned:
+                    self._warned = True
+                    print(f"Memory budget of {self.budget_bytes / 2**20:.0f} MiB is below what "
+                          f"this process uses without caches ({rss / 2**20:.0f} MiB)")
+                return False
+            # Free the excess from the caches, each in proportion to its size
+            keep = max(cached - excess, 0) / cached
+            for name, cache in self._caches.items():
+                cache.resize(max_bytes=int(stats[name]['bytes'] * keep))
+            self._shrunk_at = rss
+            self.shrinks += 1
+            return True
+        self._shrunk_at = 0
+
+        headroom = self.budget_bytes * self.low_water - rss
+        # Caches held below their configured limit that have filled up to
+        # the lower one; the others would not use a larger limit
+        limited = [name for name, s in stats.items()
+                   if s['max_bytes'] is not None
+                   and (self._configured[name] is None or s['max_bytes'] < self._configured[name])
+                   and s['bytes'] >= s['max_bytes'] * self.low_water]
+        if headroom <= 0 or not limited:
+            return False
+        # Hand the headroom out in equal parts, up to the configured limits
+        share = int(headroom / len(limited))
+        for name in limited:
+            limit = stats[name]['max_bytes'] + share
+            if self._configured[name] is not None:
+                limit = min(limit, self._configured[name])
+            self._caches[name].resize(max_bytes=limit)
+        self.grows += 1
+        return True
+
+    def report(self) -> dict:
+        """RSS, approximate bytes per component and every cache's live size"""
+        with self._lock:
+            caches = {name: cache.stats() for name, cache in self._caches.items()}
+            components = {name: size() for name, size in self._components.items()}
+            in_flight = {name: {'count': count, 'bytes': size}
+                         for name, (count, size) in self._in_flight.items()}
+        models = {name: stats['rss_bytes'] for name, stats in registry.stats().items()
+                  if stats['loads']}
+        rss = current_rss()
+        accounted = (sum(models.values()) + sum(components.values())
+                     + sum(s['bytes'] for s in caches.values())
+                     + sum(entry['bytes'] for entry in in_flight.values()))
+        return {
+            'pid': os.getpid(),
+            'rss_bytes': rss,
+            'budget_bytes': self.budget_bytes,
+            # RSS growth while each hazm resource loaded
+            'models': models,
+            'components': components,
+            'in_flight': in_flight,
+            'caches': caches,
+            'cache_bytes': sum(s['bytes'] for s in caches.values()),
+            # Interpreter, modules and everything not registered above
+            'other_bytes': max(rss - accounted, 0),
+            'shrinks': self.shrinks,
+            'grows': self.grows,
+        }
+
+
+def format_report(report: dict) -> str:
+    """The report as a text table"""
+    def mib(n):
+        return f"{n / 2**20:9.1f} MiB"
+
+    budget = report['budget_bytes']
+    lines = [f"pid {report['pid']}: RSS {mib(report['rss_bytes']).strip()}"
+             + (f" of {mib(budget).strip()} budget" if budget else " (no budget)")]
+    lines.append("models (RSS growth at load)")
+    lines.extend(f"  {name:<26}{mib(size)}" for name, size in report['models'].items())
+    lines.append("components")
+    lines.extend(f"  {name:<26}{mib(size)}" for name, size in report['components'].items())
+    for name, entry in report['in_flight'].items():
+        lines.append(f"  {name:<26}{mib(entry['bytes'])}  ({entry['count']} in flight)")
+    lines.append("caches")
+    for name, stats in report['caches'].items():
+        limit = mib(stats['max_bytes']).strip() if stats['max_bytes'] is not None else 'unbounded'
+        lines.append(f"  {name:<26}{mib(stats['bytes'])}  {stats['entries']} entries, "
+                     f"limit {limit}, hit rate {stats['hit_rate']:.1%}")
+    lines.append(f"  {'total':<26}{mib(report['cache_bytes'])}")
+    lines.append(f"{'other':<28}{mib(report['other_bytes'])}")
+    if report['shrinks'] or report['grows']:
+        lines.append(f"budget: caches shrunk {report['shrinks']} times, grown {report['grows']} times")
+    return '\n'.join(lines)
+
+
+# Singleton instance
+_memory_budget = None
+_memory_budget_lock = threading.Lock()
+
+
+def get_memory_budget() -> MemoryBudget:
+    global _memory_budget
+    if _memory_budget is None:
+        with _memory_budget_lock:
+            if _memory_budget is None:
+                budget = os.environ.get('GEC_MEMORY_BUDGET')
+                _memory_budget = MemoryBudget(parse_size(budget) if budget else None)
+    return _memory_budget
+
+
+if __name__ == '__main__':
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="Print the memory report of a warmed-up checker")
+    arg_parser.add_argument('--budget', help="memory budget, e.g. 512M (default: GEC_MEMORY_BUDGET)")
+    arg_parser.add_argument('--input', help="text file to correct before reporting")
+    args = arg_parser.parse_args()
+    if args.budget:
+        os.environ['GEC_MEMORY_BUDGET'] = args.budget
+
+    # The singleton the other modules register with lives in `memory`, not `__main__`
+    import memory
+    from engine import warm_up
+    checker = warm_up()
+    if args.input:
+        from pipeline import iter_sentences
+        with open(args.input, 'r', encoding='utf-8') as f:
+            sentences = list(iter_sentences(f))
+        for start in range(0, len(sentences), 256):
+            checker.correct_batch(sentences[start:start + 256], normalized=True)
+    memory.get_memory_budget().enforce()
+    print(memory.format_report(memory.get_memory_budget().report()))
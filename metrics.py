@@ -0,0 +1,243 @@
+from typing import Callable, Dict, List, Sequence, Tuple
+import bisect
+import threading
+
+
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _CounterChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ('_lock', '_bounds', 'counts', 'sum')
+
+    def __init__(self, lock, bounds):
+        self._lock = lock
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], _CounterChild] = {}
+
+    def labels(self, *values: str) -> _CounterChild:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, _CounterChild(self._lock))
+        return child
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def drain(self):
+        with self._lock:
+            state = {values: child.value for values, child in self._children.items() if child.value}
+            for child in self._children.values():
+                child.value = 0.0
+        return state
+
+    def merge(self, state):
+        for values, amount in state.items():
+            self.labels(*values).inc(amount)
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for values, child in sorted(self._children.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {child.value}")
+        return lines
+
+
+class Histogram:
+    """Histogram with fixed buckets, rendered cumulatively"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+
+    def labels(self, *values: str) -> _HistogramChild:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, _HistogramChild(self._lock, self.buckets))
+        return child
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def drain(self):
+        with self._lock:
+            state = {values: (list(child.counts), child.sum)
+                     for values, child in self._children.items() if any(child.counts)}
+            for child in self._children.values():
+                child.counts = [0] * len(child.counts)
+                child.sum = 0.0
+        return state
+
+    def merge(self, state):
+        for values, (counts, total) in state.items():
+            child = self.labels(*values)
+            with self._lock:
+                for i, count in enumerate(counts):
+                    child.counts[i] += count
+                child.sum += total
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for values, child in sorted(self._children.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, child.counts):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                cumulative += child.counts[-1]
+                labels = _format_labels(self.labelnames, values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, values)
+                lines.append(f"{self.name}_sum{labels} {child.sum}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time (local to this process)"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, func: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.func = func
+
+    def render(self) -> List[str]:
+        try:
+            return [f"{self.name} {float(self.func())}"]
+        except Exception:
+            return []
+
+
+class MetricsRegistry:
+    """
+    Holds all metrics of a process and renders them in the Prometheus
+    text exposition format.
+
+    Pool workers record into their own registry; drain() hands the
+    accumulated counts to the parent, which merge()s them, so /metrics
+    covers work done in any process.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, func: Callable[[], float]) -> Gauge:
+        gauge = Gauge(name, documentation, func)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def drain(self) -> dict:
+        """Take and reset the counter and histogram values (used in workers)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        state = {}
+        for metric in metrics:
+            if isinstance(metric, (Counter, Histogram)):
+                values = metric.drain()
+                if values:
+                    state[metric.name] = values
+        return state
+
+    def merge(self, state: dict):
+        for name, values in state.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+
+STAGE_SECONDS = METRICS.histogram(
+    'gec_stage_seconds', "Time spent per correction stage", ['stage'])
+SENTENCES = METRICS.counter(
+    'gec_sentences_total', "Sentences handled by PersianGrammarChecker")
+SENTENCES_UNCHANGED = METRICS.counter(
+    'gec_sentences_unchanged_total', "Analyzed sentences returned unchanged", ['reason'])
+CACHE_LOOKUPS = METRICS.counter(
+    'gec_cache_lookups_total', "Cache lookups by result", ['cache', 'result'])
+ERRORS = METRICS.counter(
+    'gec_errors_total', "Errors raised while correcting", ['where'])
+DOCUMENT_SECONDS = METRICS.histogram(
+    'gec_document_seconds', "Time spent per process_text stage", ['stage'])
+PIPELINE_QUEUE_DEPTH = METRICS.histogram(
+    'gec_pipeline_queue_depth', "Items waiting in a pipeline stage queue, sampled per item",
+    ['stage'], buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+PIPELINE_WAIT_SECONDS = METRICS.counter(
+    'gec_pipeline_wait_seconds_total',
+    "Time a pipeline stage's producer spent blocked on a full queue (put) "
+    "or its consumer on an empty one (get)", ['stage', 'side'])
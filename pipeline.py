@@ -0,0 +1,231 @@
+from engine import CorrectionEngine
+from hazm_methods import SentenceTokenizer, registry
+from metrics import PIPELINE_QUEUE_DEPTH, PIPELINE_WAIT_SECONDS
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+import codecs
+import collections
+import queue
+import re
+import threading
+import time
+
+# Where an over-long line may be cut: after sentence punctuation, else at a space
+_SENTENCE_BREAK = re.compile(r'[.!?؟;؛]\s')
+_SPACE_BREAK = re.compile(r'\s')
+
+
+def _last_break(text: str, end: int) -> int:
+    """Where to cut text[:end]: its last sentence end, else its last space, else end"""
+    for pattern in (_SENTENCE_BREAK, _SPACE_BREAK):
+        cut = 0
+        for match in pattern.finditer(text, 0, end):
+            cut = match.end()
+        if cut:
+            return cut
+    return end
+
+
+def iter_lines(stream: BinaryIO, encoding: str = 'utf-8', block_size: int = 64 * 1024,
+               max_line: int = 256 * 1024) -> Iterator[str]:
+    """
+    Decode a byte stream (an upload, a request body) into lines, reading
+    `block_size` bytes at a time. A line longer than `max_line` characters
+    is cut at its last sentence end or space, so memory stays bounded even
+    for text without newlines. Raises UnicodeDecodeError on invalid input.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    while True:
+        block = stream.read(block_size)
+        pending += decoder.decode(block, final=not block)
+        lines = pending.splitlines(keepends=True)
+        pending = ''
+        # The last piece may be an unfinished line, or a '\r' whose '\n' is
+        # in the next block; keep it for the next round
+        if block and lines and (lines[-1].endswith('\r') or not lines[-1].endswith('\n')):
+            pending = lines.pop()
+        for line in lines:
+            yield line.splitlines()[0]
+        while len(pending) > max_line:
+            cut = _last_break(pending, max_line)
+            yield pending[:cut]
+            pending = pending[cut:]
+        if not block:
+            if pending:
+                yield pending
+            return
+
+
+def iter_sentences(lines: Iterable[str],
+                   sentence_tokenizer: Optional[SentenceTokenizer] = None) -> Iterator[str]:
+    """Normalize lines and split them into sentences lazily, skipping blanks"""
+    normalizer = registry.get('normalizer')
+    sentence_tokenizer = sentence_tokenizer or SentenceTokenizer()
+    for line in lines:
+        if not line.strip():
+            continue
+        normalized_line = normalizer.normalize(line.strip())
+        for sentence in sentence_tokenizer.tokenize(normalized_line):
+            if sentence.strip():
+                yield sentence.strip()
+
+
+def iter_batches(sentences: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+    batch = []
+    for sentence in sentences:
+        batch.append(sentence)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Put on a stage's queue after the producer's last item
+_END = object()
+
+
+class Stage:
+    """
+    Runs `source` on a background thread and hands its items to the
+    thread iterating the stage through a queue of at most `maxsize`
+    items, so the next items (e.g. normalized, split sentences) are
+    produced while earlier ones are being corrected. A full queue blocks
+    the producer; an exception in the producer is raised in the consumer.
+    Leaving the loop early (break, error) stops the producer.
+
+    Producer time blocked on a full queue means the consumer is the slow
+    side; consumer time waiting on an empty queue means the producer is.
+    Both, and the queue depth seen at each item, are in stats() and in
+    /metrics under the stage name.
+    """
+
+    def __init__(self, name: str, source: Iterable, maxsize: int = 256):
+        self.name = name
+        self.maxsize = maxsize
+        self.items = 0
+        self.max_depth = 0
+        self._depth_sum = 0
+        self.producer_seconds = 0.0
+        self.producer_blocked_seconds = 0.0
+        self.consumer_waiting_seconds = 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._stopped = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._depth = PIPELINE_QUEUE_DEPTH.labels(name)
+        self._put_wait = PIPELINE_WAIT_SECONDS.labels(name, 'put')
+        self._get_wait = PIPELINE_WAIT_SECONDS.labels(name, 'get')
+        self._thread = threading.Thread(target=self._produce, args=(source,),
+                                        name=f"stage-{name}", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        start = time.perf_counter()
+        while not self._stopped.is_set():
+            try:
+                # Time out now and then to notice a consumer that went away
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            waited = time.perf_counter() - start
+            self.producer_blocked_seconds += waited
+            self._put_wait.inc(waited)
+            return True
+        return False
+
+    def _produce(self, source: Iterable):
+        try:
+            iterator = iter(source)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    self.producer_seconds += time.perf_counter() - start
+                if not self._put(item):
+                    return
+        except BaseException as e:
+            self._error = e
+        self._put(_END)
+
+    def __iter__(self) -> Iterator:
+        try:
+            while True:
+                depth = self._queue.qsize()
+                self._depth.observe(depth)
+                self.max_depth = max(self.max_depth, depth)
+                self._depth_sum += depth
+                start = time.perf_counter()
+                item = self._queue.get()
+                waited = time.perf_counter() - start
+                self.consumer_waiting_seconds += waited
+                self._get_wait.inc(waited)
+                if item is _END:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                self.items += 1
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop the producer after its current item"""
+        self._stopped.set()
+
+    def stats(self) -> dict:
+        return {
+            'stage': self.name,
+            'items': self.items,
+            'maxsize': self.maxsize,
+            'depth': self._queue.qsize(),
+            'max_depth': self.max_depth,
+            'mean_depth': self._depth_sum / self.items if self.items else 0.0,
+            'producer_seconds': self.producer_seconds,
+            'producer_blocked_seconds': self.producer_blocked_seconds,
+            'consumer_waiting_seconds': self.consumer_waiting_seconds,
+        }
+
+
+def split_ahead(name: str, sentences: Iterable[str], engine: CorrectionEngine,
+                maxsize: int = 1024) -> Iterable[str]:
+    """
+    Split on a Stage, ahead of correction, when the engine corrects in
+    worker processes. An engine correcting in this process (workers <= 1)
+    shares the GIL with the splitter thread, which then only adds thread
+    switching, so the iterator is returned as is.
+    """
+    if engine.workers <= 1:
+        return sentences
+    return Stage(name, sentences, maxsize)
+
+
+def stream_corrections(sentences: Iterable[str], engine: CorrectionEngine,
+                       batch_size: int = 64,
+                       max_in_flight: Optional[int] = None,
+                       normalized: bool = False) -> Iterator[Tuple[str, str]]:
+    """
+    Correct a (possibly unbounded) stream of sentences, yielding
+    (original, corrected) pairs in input order as soon as they are ready.
+
+    At most `max_in_flight` batches are submitted to the engine at once, so
+    memory stays bounded at roughly batch_size * max_in_flight sentences.
+    Pass normalized=True for sentences from iter_sentences. `engine` may
+    also be a BatchScheduler, which has the same submit() and workers.
+    """
+    if max_in_flight is None:
+        max_in_flight = max(engine.workers, 1) * 2
+    in_flight = collections.deque()
+
+    for batch in iter_batches(sentences, batch_size):
+        in_flight.append((batch, engine.submit(batch, normalized)))
+        # Emit finished batches at the head right away; block only when full
+        while in_flight and (len(in_flight) >= max_in_flight or in_flight[0][1].done()):
+            done, future = in_flight.popleft()
+            yield from zip(done, future.result())
+
+    while in_flight:
+        done, future = in_flight.popleft()
+        yield from zip(done, future.result())
@@ -0,0 +1,301 @@
+"""
+Table-driven rules for parsing a tagged sentence into its components.
+
+A Rule matches one token by its POS tag and, optionally, by the word
+itself, the tags around it, the next word, and a condition on what has
+been parsed so far. RuleTable turns a rule list into a dispatch table
+keyed by POS tag, with each rule's patterns compiled once into a single
+predicate; each token is looked up once and the first of its rules that
+matches runs its action, as an if/elif chain would.
+
+Adding a rule is adding a Rule to PARSE_RULES (or to a list passed to
+PersianGrammarChecker(parse_rules=...)); its position among the rules
+for the same tag sets its priority.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# prev_pos / next_pos value meaning "there is a token there, of any tag"
+ANY = frozenset(['*'])
+
+NOUN_TAGS = ('PRON', 'NOUN', 'NOUN,EZ')
+ADJ_TAGS = ('ADJ', 'ADJ,EZ')
+FINAL_PUNCTUATION = ('?', '!', '.', ';', '؟', '؛')
+
+
+class ParseState:
+    """Everything the actions read and update while one sentence is parsed"""
+
+    __slots__ = ('checker', 'tags', 'last', 'components', 'flags', 'claims')
+
+    def __init__(self, checker, tags, components, flags, claims):
+        self.checker = checker
+        self.tags = tags
+        # Index of the last token
+        self.last = len(tags) - 1
+        self.components = components
+        self.flags = flags
+        self.claims = claims
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    When a token tagged one of `pos` matches every given pattern (None:
+    no constraint) and `when(state, index)` holds, run action(state, index).
+    """
+    name: str
+    pos: Tuple[str, ...]
+    action: Callable[[ParseState, int], None]
+    words: Optional[Iterable[str]] = None
+    prev_pos: Optional[Iterable[str]] = None
+    next_pos: Optional[Iterable[str]] = None
+    next_words: Optional[Iterable[str]] = None
+    when: Optional[Callable[[ParseState, int], bool]] = None
+
+
+# A compiled rule condition, called like `when`: predicate(state, index) -> bool
+Predicate = Callable[[ParseState, int], bool]
+
+
+def _checks(rule: Rule) -> List[Predicate]:
+    """One predicate per pattern the rule sets, cheapest first"""
+    checks = []
+    if rule.words is not None:
+        words = frozenset(rule.words)
+        checks.append(lambda state, index: state.tags[index][0] in words)
+    if rule.prev_pos is ANY:
+        checks.append(lambda state, index: index > 0)
+    elif rule.prev_pos is not None:
+        prev_pos = frozenset(rule.prev_pos)
+        checks.append(lambda state, index: index > 0 and state.tags[index - 1][1] in prev_pos)
+    if rule.next_pos is ANY:
+        checks.append(lambda state, index: index < state.last)
+    elif rule.next_pos is not None:
+        next_pos = frozenset(rule.next_pos)
+        checks.append(lambda state, index: index < state.last and state.tags[index + 1][1] in next_pos)
+    if rule.next_words is not None:
+        next_words = frozenset(rule.next_words)
+        checks.append(lambda state, index: index < state.last and state.tags[index + 1][0] in next_words)
+    if rule.when is not None:
+        checks.append(rule.when)
+    return checks
+
+
+def _both(first: Predicate, second: Predicate) -> Predicate:
+    return lambda state, index: first(state, index) and second(state, index)
+
+
+def _compile_predicate(rule: Rule) -> Optional[Predicate]:
+    """The rule's patterns as one predicate, or None if it has none (always matches)"""
+    checks = _checks(rule)
+    if not checks:
+        return None
+    predicate = checks[0]
+    for check in checks[1:]:
+        predicate = _both(predicate, check)
+    return predicate
+
+
+class RuleTable:
+    """
+    Rules grouped into a dispatch table by POS tag, applied in one pass.
+    Each tag maps to a tuple of (predicate, action) pairs in rule order;
+    predicates are built once, when the table is.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        by_pos: Dict[str, List[Tuple[Optional[Predicate], Callable]]] = {}
+        for rule in self.rules:
+            compiled = (_compile_predicate(rule), rule.action)
+            for pos in rule.pos:
+                by_pos.setdefault(pos, []).append(compiled)
+        self.dispatch = {pos: tuple(compiled) for pos, compiled in by_pos.items()}
+
+    def apply(self, state: ParseState):
+        dispatch = self.dispatch
+        for index, (_, pos) in enumerate(state.tags):
+            rules = dispatch.get(pos)
+            if rules is None:
+                continue
+            for matches, action in rules:
+                if matches is None or matches(state, index):
+                    action(state, index)
+                    break
+
+
+# --- conditions ---
+
+def _owns(component: str) -> Callable[[ParseState, int], bool]:
+    """The previous token belongs to `component`"""
+    def condition(state: ParseState, index: int) -> bool:
+        return state.claims.owns(component, index - 1)
+    return condition
+
+
+def _is_the_complement(state: ParseState, index: int) -> bool:
+    # This very token is the complement picked up by the adposition
+    return state.flags.complement_found and state.claims.members['complement'] == {index}
+
+
+def _no_subject_yet(state: ParseState, index: int) -> bool:
+    return not state.flags.subject_found
+
+
+def _extends_subject(state: ParseState, index: int) -> bool:
+    return state.flags.subject_found and state.claims.owns('subject', index - 1)
+
+
+def _noun_complement_open(state: ParseState, index: int) -> bool:
+    return state.flags.linking_verb and not state.flags.noun_complement_found
+
+
+# --- actions ---
+
+def _skip(state: ParseState, index: int):
+    pass
+
+
+def _claim(state: ParseState, index: int):
+    state.claims.claim(index)
+
+
+def _final_punctuation(state: ParseState, index: int):
+    state.components.final_punctuation = state.tags[index][0]
+    state.claims.claim(index)
+
+
+def _complement(state: ParseState, index: int):
+    state.components.complement = state.tags[index + 1][0]
+    state.components.adposition = state.tags[index][0]
+    state.flags.complement_found = True
+    state.claims.set_members('complement', index + 1)
+    state.claims.claim(index, index + 1)
+
+
+def _noun_clause(state: ParseState, index: int):
+    # Vocative: "Ali!"
+    state.components.noun_clause = state.tags[index][0]
+    state.flags.noun_clause_found = True
+    state.claims.claim(index)
+
+
+def _object(state: ParseState, index: int):
+    state.components.object = state.tags[index][0]
+    state.flags.object_found = True
+    state.claims.set_members('object', index)
+    state.claims.claim(index, index + 1)
+
+
+def _subject(state: ParseState, index: int):
+    word = state.tags[index][0]
+    state.components.subject = word
+    state.flags.subject_found = True
+    state.flags.subject_is_plural = state.checker.is_plural_noun(word) or word in ['ما', 'شما', 'آنها']
+    state.claims.set_members('subject', index)
+    state.claims.claim(index)
+
+
+def _adverb(state: ParseState, index: int):
+    state.components.adverbs.append(state.tags[index][0])
+    state.claims.claim(index)
+
+
+def _join_next(component: str, claim_next: bool, plural: bool = False):
+    """'X and Y': append the conjunction and the next word to `component`"""
+    def action(state: ParseState, index: int):
+        joined = f"{getattr(state.components, component)} {state.tags[index][0]} {state.tags[index + 1][0]}"
+        setattr(state.components, component, joined)
+        if plural:
+            state.flags.subject_is_plural = True
+        state.claims.add_members(component, index, index + 1)
+        if claim_next:
+            state.claims.claim(index, index + 1)
+        else:
+            state.claims.claim(index)
+    return action
+
+
+def _extend(component: str):
+    """Append the word to `component`, which the previous token belongs to"""
+    def action(state: ParseState, index: int):
+        setattr(state.components, component,
+                f"{getattr(state.components, component)} {state.tags[index][0]}")
+        state.claims.add_members(component, index)
+        state.claims.claim(index)
+    return action
+
+
+def _noun_complement(state: ParseState, index: int):
+    state.components.noun_complement = state.tags[index][0]
+    state.flags.noun_complement_found = True
+    state.claims.claim(index)
+
+
+def _verb(state: ParseState, index: int):
+    components, flags, claims, tags = state.components, state.flags, state.claims, state.tags
+    word = tags[index][0]
+    if not flags.verb_found:
+        components.verb = word
+        flags.verb_found = True
+        flags.linking_verb = state.checker.is_linking_verb(word)
+
+    if index + 1 < len(tags) and tags[index + 1][1] == 'VERB':
+        components.verb = f"{components.verb}_{tags[index + 1][0]}"
+        flags.verb_part_found = True
+        claims.claim(index + 1)
+
+    # Compound verb: a free noun or adjective right before the verb
+    if (index > 0 and tags[index - 1][1] in ('NOUN', 'NOUN,EZ', 'ADJ')
+            and not claims.owns('complement', index - 1)
+            and not claims.owns('object', index - 1)
+            and not claims.owns('subject', index - 1)):
+        previous = tags[index - 1][0]
+        if flags.linking_verb:
+            components.noun_complement = previous
+            flags.noun_complement_found = True
+        else:
+            # Append as prefix to verb
+            components.verb = f"{previous}_{components.verb}"
+            flags.verb_part_found = True
+        claims.claim(index - 1)
+
+    claims.claim(index)
+
+
+PARSE_RULES = [
+    Rule('final_punctuation', ('PUNCT', 'PUNC'), _final_punctuation, words=FINAL_PUNCTUATION),
+    Rule('punctuation', ('PUNCT', 'PUNC'), _claim),
+
+    # 'را' is claimed with its object by the noun rule
+    Rule('object_marker', ('ADP', 'ADP,EZ'), _skip, words=['را']),
+    Rule('complement', ('ADP', 'ADP,EZ'), _complement, next_pos=NOUN_TAGS + ('DET',) + ADJ_TAGS),
+
+    Rule('adposition_complement', NOUN_TAGS, _skip, when=_is_the_complement),
+    Rule('noun_clause', NOUN_TAGS, _noun_clause, next_words=['!']),
+    Rule('object', NOUN_TAGS, _object, next_words=['را']),
+    Rule('subject', NOUN_TAGS, _subject, when=_no_subject_yet),
+
+    # The noun after it is picked up by the noun rules
+    Rule('determiner', ('DET',), _claim, next_pos=NOUN_TAGS + ADJ_TAGS),
+
+    Rule('joined_subject', ('CCONJ',), _join_next('subject', claim_next=True, plural=True),
+         next_pos=NOUN_TAGS, when=_extends_subject),
+    Rule('joined_complement', ('CCONJ',), _join_next('complement', claim_next=False),
+         next_pos=NOUN_TAGS, when=_owns('complement')),
+    Rule('joined_object', ('CCONJ',), _join_next('object', claim_next=False),
+         next_pos=NOUN_TAGS, when=_owns('object')),
+
+    Rule('adverb', ('ADV',), _adverb),
+
+    Rule('subject_adjective', ADJ_TAGS, _extend('subject'), when=_owns('subject')),
+    Rule('object_adjective', ADJ_TAGS, _extend('object'), when=_owns('object')),
+    Rule('complement_adjective', ADJ_TAGS, _extend('complement'), when=_owns('complement')),
+    Rule('noun_complement', ADJ_TAGS, _noun_complement, prev_pos=ANY, when=_noun_complement_open),
+
+    Rule('verb', ('VERB',), _verb),
+
+    Rule('subject_clause', ('SCONJ',), _extend('subject'), when=_owns('subject')),
+    Rule('complement_clause', ('SCONJ',), _extend('complement'), when=_owns('complement')),
+]
@@ -0,0 +1,168 @@
+from engine import CorrectionEngine
+from typing import List, Optional
+import concurrent.futures
+import queue
+import threading
+import time
+
+
+class BatchScheduler:
+    """
+    Micro-batching front end for the correction engine.
+
+    Sentences from concurrent callers are gathered into one batch until
+    either `max_batch` sentences are waiting or `max_wait` seconds have
+    passed since the first of them arrived. The batch is corrected with a
+    single engine call and each caller gets back its own slice. Up to
+    `max_concurrent` batches run at once, so a new batch can be gathered
+    while the previous one is being corrected.
+
+    Set `normalized` when callers pass sentences that already went through
+    the normalizer (as Document sentences do), so workers skip it.
+
+    Larger `max_wait` gives bigger batches (throughput) at the cost of up
+    to `max_wait` extra latency per request; stats() shows what you get.
+    """
+
+    def __init__(self, engine: CorrectionEngine, max_wait: float = 0.005,
+                 max_batch: int = 256, max_concurrent: Optional[int] = None,
+                 normalized: bool = False):
+        self.engine = engine
+        self.normalized = normalized
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.max_concurrent = max_concurrent or max(engine.workers, 1)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrent, thread_name_prefix="batch"
+        )
+        self._slots = threading.Semaphore(self.max_concurrent)
+        self._stats_lock = threading.Lock()
+        # Taken by submit() and close() so nothing is queued after the sentinel
+        self._submit_lock = threading.Lock()
+        self._closed = False
+
+        self.requests = 0
+        self.batches = 0
+        self.sentences = 0
+        self.wait_seconds = 0.0
+        self.correct_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+        self._thread.start()
+
+    @property
+    def workers(self) -> int:
+        return self.engine.workers
+
+    def correct(self, sentences: List[str]) -> List[str]:
+        """Correct sentences as part of a shared batch; blocks until done"""
+        if not sentences:
+            return []
+        return self.submit(sentences).result()
+
+    def submit(self, sentences: List[str], normalized: Optional[bool] = None) -> concurrent.futures.Future:
+        """
+        Queue sentences for a shared batch, returning a Future of the
+        corrected list. Same interface as CorrectionEngine.submit, so the
+        scheduler can stand in for the engine in stream_corrections.
+        """
+        if normalized is not None and normalized != self.normalized:
+            raise ValueError(f"BatchScheduler corrects with normalized={self.normalized}")
+        future = concurrent.futures.Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("BatchScheduler is closed")
+            if not sentences:
+                future.set_result([])
+                return future
+            self._queue.put((sentences, future, time.perf_counter()))
+        return future
+
+    def close(self):
+        """Correct what was queued before closing; later submits raise RuntimeError"""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        # Nothing should be left, but a caller must never wait forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError('scheduler closed'))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            # Wait for a free slot first so the window opens only when a
+            # batch can actually start
+            self._slots.acquire()
+            pending = [item]
+            size = len(item[0])
+            deadline = time.perf_counter() + self.max_wait
+            stopping = False
+            while size < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            self._executor.submit(self._run_batch, pending)
+            if stopping:
+                return
+
+    def _run_batch(self, pending):
+        start = time.perf_counter()
+        try:
+            batch = [sentence for sentences, _, _ in pending for sentence in sentences]
+            try:
+                corrected = self.engine.correct(batch, self.normalized)
+            except Exception as e:
+                for _, future, _ in pending:
+                    future.set_exception(e)
+                return
+
+            offset = 0
+            for sentences, future, _ in pending:
+                future.set_result(corrected[offset:offset + len(sentences)])
+                offset += len(sentences)
+
+            end = time.perf_counter()
+            with self._stats_lock:
+                self.requests += len(pending)
+                self.batches += 1
+                self.sentences += len(batch)
+                self.wait_seconds += sum(start - queued for _, _, queued in pending)
+                self.correct_seconds += end - start
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                'max_wait_ms': self.max_wait * 1000,
+                'max_batch': self.max_batch,
+                'requests': self.requests,
+                'batches': self.batches,
+                'sentences': self.sentences,
+                'queued': self._queue.qsize(),
+                'mean_batch_size': self.sentences / self.batches if self.batches else 0.0,
+                'mean_requests_per_batch': self.requests / self.batches if self.batches else 0.0,
+                'mean_queue_wait_ms': self.wait_seconds / self.requests * 1000 if self.requests else 0.0,
+                'mean_batch_ms': self.correct_seconds / self.batches * 1000 if self.batches else 0.0,
+            }
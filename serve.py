@@ -0,0 +1,137 @@
+"""
+Preloaded, multi-process web server.
+
+The parent process loads every model and lexicon, runs a warm-up
+correction and freezes the heap (gc.freeze), then forks the workers.
+The workers share the parent's model pages copy-on-write instead of
+loading their own copies, and a worker that dies is replaced by a new
+fork that is already warm.
+
+    python serve.py --workers 4 --host 0.0.0.0 --port 5000
+
+Each worker answers /ready with 200 once its own warm-up is done.
+"""
+from engine import warm_up
+from hazm_methods import registry, current_rss
+from metrics import METRICS
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def _exit_on_signal(signum, frame):
+    # Ignore repeats (the parent and a process-group signal can both arrive)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.exit(0)
+
+
+def run_worker(sock: socket.socket, host: str, port: int):
+    """Body of a forked worker; never returns"""
+    code = 0
+    try:
+        # The tagger preloaded by the parent's main thread goes to whichever
+        # batch thread asks for it first, instead of a fresh copy
+        registry.detach_thread_instances()
+        # Start from zero rather than the parent's warm-up counts
+        METRICS.drain()
+        signal.signal(signal.SIGTERM, _exit_on_signal)
+        signal.signal(signal.SIGINT, _exit_on_signal)
+
+        from werkzeug.serving import make_server
+        # Imported after the fork: app starts its scheduler, log writer
+        # and warm-up threads, which must live in this process
+        import app as web
+        server = make_server(host, port, web.app, threaded=True, fd=sock.fileno())
+        try:
+            server.serve_forever()
+        except SystemExit:
+            pass
+        finally:
+            server.server_close()
+            # Hand running jobs back before what they correct on is closed
+            web.jobs.close()
+            web.scheduler.close()
+            web.log_writer.close()
+    except BaseException as e:
+        print(f"Worker {os.getpid()} failed: {e}")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def spawn_worker(sock: socket.socket, host: str, port: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        run_worker(sock, host, port)
+    return pid
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Preloaded multi-process server")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=5000)
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="number of forked server processes (default: CPU count)")
+    arg_parser.add_argument('--backlog', type=int, default=128)
+    args = arg_parser.parse_args()
+
+    # The forked processes are the parallelism; each one corrects in-process
+    # unless GEC_WORKERS asks for a pool per worker
+    os.environ.setdefault('GEC_WORKERS', '1')
+
+    # Bind before loading so a busy port fails fast; connections queue meanwhile
+    sock = socket.create_server((args.host, args.port), backlog=args.backlog)
+    sock.set_inheritable(True)
+
+    start = time.perf_counter()
+    warm_up()
+    # Move everything allocated so far out of the collector's reach, so GC
+    # passes in the workers do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    print(f"Warmed up in {time.perf_counter() - start:.1f} s, "
+          f"RSS {current_rss() / 2**20:.0f} MiB; starting {args.workers} workers "
+          f"on http://{args.host}:{args.port}")
+
+    stopping = False
+    workers = {}
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(args.workers):
+        workers[spawn_worker(sock, args.host, args.port)] = time.monotonic()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+        # Avoid a tight respawn loop when workers die right after starting
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        workers[spawn_worker(sock, args.host, args.port)] = time.monotonic()
+
+    sock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+POS tagging backend with a per-word feature cache.
+
+hazm's POSTagger builds a feature dict for every token on every call
+and crfsuite then turns each dict into attribute strings. Most of those
+attributes depend only on the word itself; in traffic where words repeat
+heavily they are the same strings over and over.
+
+CachedPOSTagger loads the same model (resources/pos_tagger.model) and
+gives crfsuite exactly the attributes hazm's feature template produces,
+in the same order, already encoded. Each word type's attributes are
+built once and kept in a bounded LRU cache:
+
+    word, prefix-1..3, suffix-1..3, is_numeric, is_punc
+        the word's own features
+    prev_word, two_prev_word, next_word, two_next_word, prev_/next_is_*
+        taken from the neighbouring words' cache entries
+
+hazm passes booleans as attributes weighted 1.0 (True) or 0.0 (False).
+A zero-weighted attribute adds nothing to any score, so False features
+are left out, and tags and scores are the same as hazm's.
+"""
+from caching import LRUCache, MISSING
+from memory import get_memory_budget
+from metrics import CACHE_LOOKUPS
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+import threading
+
+
+_FEATURE_CACHE_HIT = CACHE_LOOKUPS.labels('tagger_features', 'hit')
+_FEATURE_CACHE_MISS = CACHE_LOOKUPS.labels('tagger_features', 'miss')
+
+# Context attributes of a token with no word at that position
+_NO_PREV = (b'prev_word:', b'two_prev_word:')
+_NO_NEXT = b'next_word:'
+_NO_TWO_NEXT = b'two_next_word:'
+
+
+class WordFeatures(NamedTuple):
+    """Encoded crfsuite attributes of one word type"""
+    word: bytes
+    # prefix-1..3 and suffix-1..3
+    affixes: Tuple[bytes, ...]
+    # The word as seen from the tokens around it
+    as_prev: bytes
+    as_two_prev: bytes
+    as_next: bytes
+    as_two_next: bytes
+    is_numeric: bool
+    is_punc: bool
+
+
+def word_features(word: str, punctuation) -> WordFeatures:
+    """Attributes of `word`, as in hazm's POSTagger.features template"""
+    encoded = word.encode('utf-8')
+
+    def attr(name: str, value: str) -> bytes:
+        return name.encode('ascii') + b':' + value.encode('utf-8')
+
+    return WordFeatures(
+        word=b'word:' + encoded,
+        affixes=(attr('prefix-1', word[0]), attr('prefix-2', word[:2]), attr('prefix-3', word[:3]),
+                 attr('suffix-1', word[-1]), attr('suffix-2', word[-2:]), attr('suffix-3', word[-3:])),
+        as_prev=b'prev_word:' + encoded,
+        as_two_prev=b'two_prev_word:' + encoded,
+        as_next=b'next_word:' + encoded,
+        as_two_next=b'two_next_word:' + encoded,
+        is_numeric=word.isdigit(),
+        is_punc=word in punctuation,
+    )
+
+
+class WordFeatureCache:
+    """
+    Bounded, thread-safe cache of WordFeatures keyed by word, shared by
+    the per-thread taggers of a process.
+    """
+
+    def __init__(self, punctuation: Iterable[str], max_entries: int = 50000,
+                 max_bytes: Optional[int] = 32 * 1024 * 1024):
+        self.punctuation = frozenset(punctuation)
+        self._cache = LRUCache(max_entries, max_bytes)
+
+    def lookup(self, tokens: List[str]) -> List[WordFeatures]:
+        """Features of each token, building the missing word types"""
+        found = {}
+        misses = 0
+        for word in tokens:
+            if word in found:
+                continue
+            features = self._cache.get(word)
+            if features is MISSING:
+                features = word_features(word, self.punctuation)
+                self._cache.put(word, features)
+                misses += 1
+            found[word] = features
+        if misses:
+            _FEATURE_CACHE_MISS.inc(misses)
+        if len(found) > misses:
+            _FEATURE_CACHE_HIT.inc(len(found) - misses)
+        return [found[word] for word in tokens]
+
+    def clear(self):
+        self._cache.clear()
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self._cache.resize(max_entries, max_bytes)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+def sentence_attributes(features: List[WordFeatures]) -> List[List[bytes]]:
+    """crfsuite items of a sentence, attribute for attribute as hazm builds them"""
+    last = len(features) - 1
+    items = []
+    for index, current in enumerate(features):
+        attrs = [current.word]
+        if index == 0:
+            attrs.append(b'is_first')
+        if index == last:
+            attrs.append(b'is_last')
+        attrs.extend(current.affixes)
+
+        if index == 0:
+            attrs.extend(_NO_PREV)
+        else:
+            prev = features[index - 1]
+            # hazm reads sentence[index - 2] unguarded, so the second token
+            # sees the sentence's last word as its two_prev_word
+            attrs.append(prev.as_prev)
+            attrs.append(features[index - 2].as_two_prev)
+        if index == last:
+            attrs.append(_NO_NEXT)
+        else:
+            nxt = features[index + 1]
+            attrs.append(nxt.as_next)
+        attrs.append(_NO_TWO_NEXT if index >= last - 1 else features[index + 2].as_two_next)
+
+        if current.is_numeric:
+            attrs.append(b'is_numeric')
+        if index == 0:
+            attrs.append(b'prev_is_numeric:')
+        elif prev.is_numeric:
+            attrs.append(b'prev_is_numeric')
+        if index == last:
+            attrs.append(b'next_is_numeric:')
+        elif nxt.is_numeric:
+            attrs.append(b'next_is_numeric')
+
+        if current.is_punc:
+            attrs.append(b'is_punc')
+        if index == 0:
+            attrs.append(b'prev_is_punc:')
+        elif prev.is_punc:
+            attrs.append(b'prev_is_punc')
+        if index == last:
+            attrs.append(b'next_is_punc:')
+        elif nxt.is_punc:
+            attrs.append(b'next_is_punc')
+
+        items.append(attrs)
+    return items
+
+
+class CachedPOSTagger:
+    """
+    Drop-in for hazm.POSTagger's tag / tag_sents on a crfsuite model,
+    with features served from a WordFeatureCache. Like hazm's tagger, an
+    instance holds a crfsuite handle and must stay on one thread.
+    """
+
+    def __init__(self, model: str, cache: WordFeatureCache):
+        import pycrfsuite
+        self.model = pycrfsuite.Tagger()
+        self.model.open(model)
+        self.cache = cache
+
+    def tag(self, tokens: List[str]) -> List[Tuple[str, str]]:
+        if not tokens:
+            return []
+        labels = self.model.tag(sentence_attributes(self.cache.lookup(tokens)))
+        return list(zip(tokens, labels))
+
+    def tag_sents(self, sentences: List[List[str]]) -> List[List[Tuple[str, str]]]:
+        return [self.tag(tokens) for tokens in sentences]
+
+
+# Singleton instance
+_feature_cache = None
+_feature_cache_lock = threading.Lock()
+
+
+def get_feature_cache() -> WordFeatureCache:
+    global _feature_cache
+    if _feature_cache is None:
+        with _feature_cache_lock:
+            if _feature_cache is None:
+                # The tagger's own punctuation list, so is_punc matches it exactly
+                from hazm.pos_tagger import punctuation_list
+                _feature_cache = WordFeatureCache(punctuation_list)
+                get_memory_budget().add_cache('tagger_features', _feature_cache)
+    return _feature_cache
@@ -0,0 +1,71 @@
+from caching import LRUCache, MISSING, approx_size
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Analysis:
+    lemma: str = ''
+    forms: dict = field(default_factory=dict)
+
+
+def test_approx_size_counts_dataclass_fields():
+    empty = Analysis()
+    full = Analysis('رفت#رو', {'رفت': ['رفتم', 'رفتی', 'رفت', 'رفتیم', 'رفتید', 'رفتند']})
+    assert approx_size(full) > approx_size(empty) + approx_size(full.forms) // 2
+
+
+def test_put_and_get():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', None)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') is MISSING
+    cache.put('c', 3)
+    # 'b' was the least recently used
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+
+
+def test_reaccount_tracks_values_changed_in_place():
+    cache = LRUCache(max_entries=10)
+    value = Analysis()
+    cache.put('word', value)
+    before = cache.bytes
+    value.forms['root'] = ['form'] * 50
+    value.lemma = 'lemma' * 20
+    cache.reaccount('word')
+    assert cache.bytes == approx_size('word') + approx_size(value) > before
+    # Nothing changed: nothing to add
+    cache.reaccount('word')
+    assert cache.bytes == approx_size('word') + approx_size(value)
+
+
+def test_reaccount_enforces_the_byte_limit():
+    small = Analysis()
+    limit = 3 * (approx_size('a') + approx_size(small))
+    cache = LRUCache(max_entries=10, max_bytes=limit)
+    values = {key: Analysis() for key in 'abc'}
+    for key, value in values.items():
+        cache.put(key, value)
+    assert len(cache) == 3
+    values['c'].forms['root'] = ['form'] * 3
+    cache.reaccount('c')
+    # 'c' grew past what is left; older entries make room
+    assert cache.bytes <= limit
+    assert 'c' in cache and 'a' not in cache
+
+
+def test_reaccount_drops_entry_larger_than_the_limit():
+    cache = LRUCache(max_entries=10, max_bytes=1000)
+    value = Analysis()
+    cache.put('a', value)
+    value.forms['root'] = ['form'] * 200
+    cache.reaccount('a')
+    assert 'a' not in cache
+    assert cache.bytes == 0
+
+
+def test_reaccount_of_missing_key_is_a_no_op():
+    cache = LRUCache()
+    cache.reaccount('nothing')
+    assert cache.bytes == 0
@@ -0,0 +1,148 @@
+from engine import CorrectionEngine
+from jobs import JobQueue, JobStore, job_progress
+from pipeline import iter_sentences
+import sqlite3
+import time
+
+TEXT = "من به مدرسه رفتیم. کارگران خسته است.\nما فردا به سفر می‌روم.\nمن سیب دوست داریم."
+
+
+def wait_for(store, job_id, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish: {store.get(job_id)}")
+
+
+def test_claim_skips_own_running_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create(TEXT)
+    assert store.claim('a', stale_after=60)[0] == job_id
+    # Stale by its timestamp, but its owner is the one asking
+    assert store.claim('a', stale_after=0) is None
+    assert store.claim('b', stale_after=0)[0] == job_id
+
+
+def test_touch_keeps_job_from_going_stale(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create(TEXT)
+    store.claim('a', stale_after=60)
+    before = store.get(job_id)['updated']
+    time.sleep(0.01)
+    store.touch('b', [job_id])
+    assert store.get(job_id)['updated'] == before
+    store.touch('a', [job_id])
+    assert store.get(job_id)['updated'] > before
+
+
+def test_job_resumes_after_release(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    sentences = list(iter_sentences(TEXT.splitlines()))
+    job_id = store.create(TEXT)
+    assert store.claim('crashed', stale_after=60) == (job_id, TEXT, 0)
+    # Two sentences committed, marked so a second correction would show
+    committed = [(original, 'committed') for original in sentences[:2]]
+    store.add_results(job_id, 0, committed)
+    store.release(job_id)
+    assert store.get(job_id)['status'] == 'queued'
+
+    engine = CorrectionEngine(workers=1)
+    queue = JobQueue(store, engine, workers=1, batch_size=2, poll_interval=0.05)
+    try:
+        job = wait_for(store, job_id)
+    finally:
+        queue.close()
+
+    assert job['status'] == 'finished'
+    assert job['done'] == job['total'] == len(sentences)
+    results = list(store.iter_results(job_id))
+    assert results[:2] == committed
+    assert results[2:] == list(zip(sentences[2:], engine.correct(sentences[2:], normalized=True)))
+
+
+def test_engine_shutdown_releases_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    # A pool engine shut down while the job was running (as at exit)
+    engine = CorrectionEngine(workers=2)
+    engine.shutdown()
+    queue = JobQueue(store, engine, workers=0)
+    job_id = store.create(TEXT)
+    try:
+        queue._run_job(*store.claim(queue.owner, queue.stale_after))
+    finally:
+        queue.close()
+    job = store.get(job_id)
+    assert job['status'] == 'queued'
+    assert job['error'] is None
+
+
+def test_progress_is_known_while_running(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    # Distinct sentences, so none is answered from a cache
+    text = '\n'.join(f"من {i} کتاب به مدرسه بردیم." for i in range(1500))
+    job_id = store.create(text)
+    engine = CorrectionEngine(workers=1)
+    queue = JobQueue(store, engine, workers=1, batch_size=8, poll_interval=0.05)
+    seen = []
+    try:
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            job = store.get(job_id)
+            if job['status'] == 'running' and job['done']:
+                seen.append(job_progress(job))
+            elif job['status'] not in ('queued', 'running'):
+                break
+            time.sleep(0.002)
+    finally:
+        queue.close()
+    assert job['status'] == 'finished' and job_progress(job) == 1.0
+    assert None not in seen
+    assert len(set(seen)) > 1
+    # Done may reach the total just before the job is marked finished
+    assert seen == sorted(seen) and 0 < seen[0] and seen[-1] <= 1
+
+
+def test_worker_survives_store_errors(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    claim = store.claim
+    failures = []
+
+    def locked_once(owner, stale_after):
+        if not failures:
+            failures.append(owner)
+            raise sqlite3.OperationalError("database is locked")
+        return claim(owner, stale_after)
+
+    store.claim = locked_once
+    queue = JobQueue(store, CorrectionEngine(workers=1), workers=1, poll_interval=0.05)
+    try:
+        job_id = queue.submit(TEXT)
+        job = wait_for(store, job_id)
+    finally:
+        queue.close()
+    assert failures
+    assert job['status'] == 'finished'
+
+
+def test_job_error_while_closing_fails_the_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = JobQueue(store, CorrectionEngine(workers=1), workers=0)
+
+    class FailingEngine(CorrectionEngine):
+        def submit(self, sentences, normalized=False):
+            # The queue starts closing, then the job itself goes wrong
+            queue._closed = True
+            raise ValueError("bad input")
+
+    queue.engine = FailingEngine(workers=1)
+    job_id = store.create(TEXT)
+    try:
+        queue._run_job(*store.claim(queue.owner, queue.stale_after))
+    finally:
+        queue.close()
+    job = store.get(job_id)
+    assert job['status'] == 'failed'
+    assert job['error'] == "bad input"
@@ -0,0 +1,86 @@
+from caching import SentenceCache
+from grammarchecker import PersianGrammarChecker
+from lexicon import (SOURCES, LexiconStore, compile_lexicon, load_lexicon, read_header,
+                     sources_signature)
+import os
+
+
+def write_source(directory, name, words):
+    with open(os.path.join(directory, SOURCES[name][0]), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(words) + '\n')
+
+
+def test_round_trip(tmp_path):
+    write_source(str(tmp_path), 'adverbs', ['فردا', 'امروز', 'دیروز', 'امروز'])
+    lexicon = load_lexicon(str(tmp_path))
+    assert lexicon.mapped
+    assert set(lexicon.lists) == set(SOURCES)
+    adverbs = lexicon['adverbs']
+    # Sorted bytewise, duplicates dropped
+    assert list(adverbs) == sorted({'فردا', 'امروز', 'دیروز'}, key=lambda w: w.encode('utf-8'))
+    assert 'فردا' in adverbs and 'پریروز' not in adverbs and 1 not in adverbs
+    # Lists without a source file hold the built-in words
+    assert list(lexicon['linking_verbs']) == sorted(SOURCES['linking_verbs'][1],
+                                                    key=lambda w: w.encode('utf-8'))
+
+
+def test_every_word_is_found(tmp_path):
+    words = [f"واژه{i}" for i in range(500)] + ['a', 'ab', 'b', '']
+    write_source(str(tmp_path), 'singular_exceptions', words)
+    words_list = load_lexicon(str(tmp_path))['singular_exceptions']
+    assert len(words_list) == len({w for w in words if w})
+    assert all(word in words_list for word in words if word)
+
+
+def test_header_records_the_sources_signature(tmp_path):
+    write_source(str(tmp_path), 'adverbs', ['فردا'])
+    header = read_header(compile_lexicon(str(tmp_path)))
+    assert header['signature'] == sources_signature(str(tmp_path))
+    assert header['signature']['adverbs'] is not None
+    assert header['signature']['linking_verbs'] is None
+
+
+def test_rejects_other_files():
+    assert read_header(b'') is None
+    assert read_header(b'not a lexicon at all') is None
+
+
+def test_stale_file_is_recompiled(tmp_path):
+    write_source(str(tmp_path), 'adverbs', ['فردا'])
+    assert list(load_lexicon(str(tmp_path))['adverbs']) == ['فردا']
+    write_source(str(tmp_path), 'adverbs', ['فردا', 'امروز'])
+    assert set(load_lexicon(str(tmp_path))['adverbs']) == {'فردا', 'امروز'}
+
+
+def test_reload_bumps_generation_and_clears_cache_once(tmp_path):
+    write_source(str(tmp_path), 'adverbs', ['فردا'])
+    store = LexiconStore(str(tmp_path), check_interval=0)
+    cache = SentenceCache(lexicon_store=store)
+    cache.put('جمله', None)
+    cache.check_lexicon()
+    assert cache.stats()['entries'] == 1
+
+    write_source(str(tmp_path), 'adverbs', ['فردا', 'امروز'])
+    cache.check_lexicon()
+    assert store.generation == 1
+    assert 'امروز' in store.lexicon['adverbs']
+    assert cache.stats()['entries'] == 0
+
+    cache.put('جمله', None)
+    cache.check_lexicon()
+    assert cache.stats()['entries'] == 1
+    assert cache.invalidations == 1
+
+
+def test_checker_invalidates_once_per_reload(tmp_path):
+    write_source(str(tmp_path), 'adverbs', ['فردا'])
+    store = LexiconStore(str(tmp_path), check_interval=0)
+    checker = PersianGrammarChecker(lexicon_store=store)
+    checker.sentence_cache.put('جمله', None)
+
+    write_source(str(tmp_path), 'adverbs', ['فردا', 'امروز'])
+    checker.check_lexicon()
+    checker.check_lexicon()
+    assert 'امروز' in checker.adverbs
+    assert checker.sentence_cache.stats()['entries'] == 0
+    assert checker.sentence_cache.invalidations == 1
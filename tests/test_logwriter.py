@@ -0,0 +1,69 @@
+from logwriter import LogWriter
+import gzip
+import json
+import pytest
+import time
+
+
+def read_entries(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_entries_are_written_in_order(tmp_path):
+    path = str(tmp_path / "log.json")
+    writer = LogWriter(path, batch_size=3)
+    entries = [{"original": f"جمله {i}", "corrected": f"جمله {i}"} for i in range(10)]
+    writer.write(entries)
+    assert writer.flush(timeout=5)
+    writer.close()
+    assert read_entries(path) == entries
+    assert writer.stats()['written'] == 10
+
+
+def test_rotation_keeps_backup_count_files(tmp_path):
+    path = str(tmp_path / "log.json")
+    writer = LogWriter(path, batch_size=1, max_bytes=100, backup_count=2)
+    for i in range(6):
+        writer.write([{"original": "x" * 40, "index": i}])
+        assert writer.flush(timeout=5)
+    writer.close()
+
+    assert writer.rotations >= 2
+    assert (tmp_path / "log.json.1").exists()
+    assert (tmp_path / "log.json.2").exists()
+    assert not (tmp_path / "log.json.3").exists()
+    # The newest entry is in the live file, the ones before it in the backups
+    assert read_entries(path)[-1]['index'] == 5
+    assert read_entries(path + ".1")[-1]['index'] == read_entries(path)[0]['index'] - 1
+
+
+def test_rotation_compresses_backups(tmp_path):
+    path = str(tmp_path / "log.json")
+    writer = LogWriter(path, batch_size=1, max_bytes=100, backup_count=3, compress=True)
+    for i in range(4):
+        writer.write([{"original": "x" * 40, "index": i}])
+        assert writer.flush(timeout=5)
+    writer.close()
+
+    assert not (tmp_path / "log.json.1").exists()
+    with gzip.open(path + ".1.gz", 'rt', encoding='utf-8') as f:
+        rotated = [json.loads(line) for line in f]
+    assert rotated
+    assert rotated[-1]['index'] == read_entries(path)[0]['index'] - 1
+
+
+def test_flush_after_close_returns_at_once(tmp_path):
+    writer = LogWriter(str(tmp_path / "log.json"))
+    writer.write([{"original": "a"}])
+    writer.close()
+    start = time.monotonic()
+    assert writer.flush(timeout=5)
+    assert time.monotonic() - start < 1
+
+
+def test_write_after_close_raises(tmp_path):
+    writer = LogWriter(str(tmp_path / "log.json"))
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.write([{"original": "a"}])
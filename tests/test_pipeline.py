@@ -0,0 +1,53 @@
+from pipeline import iter_lines
+import io
+import pytest
+
+
+def lines_of(data: bytes, **kwargs):
+    return list(iter_lines(io.BytesIO(data), **kwargs))
+
+
+def test_splits_on_every_line_ending():
+    assert lines_of(b"a\nb\r\nc\rd") == ['a', 'b', 'c', 'd']
+
+
+def test_keeps_blank_lines():
+    assert lines_of(b"a\n\nb\n") == ['a', '', 'b']
+
+
+@pytest.mark.parametrize('block_size', [1, 2, 3, 4, 5])
+def test_crlf_split_across_blocks(block_size):
+    # Wherever the block boundary falls, '\r\n' is one line ending, not two
+    assert lines_of(b"ab\r\ncd\r\n\r\nef", block_size=block_size) == ['ab', 'cd', '', 'ef']
+
+
+def test_trailing_cr_at_end_of_input():
+    assert lines_of(b"ab\r", block_size=3) == ['ab']
+
+
+@pytest.mark.parametrize('block_size', [1, 3, 64 * 1024])
+def test_multibyte_characters_split_across_blocks(block_size):
+    text = "من به مدرسه رفتم.\nکارگران خسته‌اند."
+    assert lines_of(text.encode('utf-8'), block_size=block_size) == text.split('\n')
+
+
+def test_long_line_is_cut_at_sentence_end_across_blocks():
+    sentence = "این یک جمله است. "
+    data = (sentence * 40).encode('utf-8')
+    max_line = 100
+    lines = lines_of(data, block_size=7, max_line=max_line)
+    assert len(lines) > 1
+    assert all(len(line) <= max_line for line in lines)
+    # Cut after a sentence end, so no sentence is split in two
+    assert all(line.endswith('. ') for line in lines[:-1])
+    assert ''.join(lines) == sentence * 40
+
+
+def test_long_line_without_breaks_is_cut_at_max_line():
+    lines = lines_of(b"x" * 250, block_size=16, max_line=100)
+    assert [len(line) for line in lines] == [100, 100, 50]
+
+
+def test_invalid_utf8_raises():
+    with pytest.raises(UnicodeDecodeError):
+        lines_of(b"ok\n\xff\xfe")
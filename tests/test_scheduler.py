@@ -0,0 +1,55 @@
+from scheduler import BatchScheduler
+import concurrent.futures
+import pytest
+import threading
+
+
+class UpperEngine:
+    """Stands in for CorrectionEngine: 'corrects' by upper-casing"""
+    workers = 1
+
+    def correct(self, sentences, normalized=False):
+        return [sentence.upper() for sentence in sentences]
+
+
+def test_callers_get_their_own_slice():
+    scheduler = BatchScheduler(UpperEngine(), max_wait=0.05)
+    try:
+        futures = [scheduler.submit([f"s{i}", f"t{i}"]) for i in range(10)]
+        assert [f.result(5) for f in futures] == [[f"S{i}", f"T{i}"] for i in range(10)]
+        assert scheduler.stats()['batches'] < 10
+    finally:
+        scheduler.close()
+
+
+def test_submit_after_close_raises():
+    scheduler = BatchScheduler(UpperEngine())
+    scheduler.close()
+    with pytest.raises(RuntimeError):
+        scheduler.submit(['a'])
+
+
+def test_close_racing_submits_resolves_every_future():
+    for _ in range(20):
+        scheduler = BatchScheduler(UpperEngine(), max_wait=0.001)
+        futures = []
+        start = threading.Barrier(5)
+
+        def submit_many():
+            start.wait()
+            for i in range(200):
+                try:
+                    futures.append(scheduler.submit([str(i)]))
+                except RuntimeError:
+                    return
+
+        threads = [threading.Thread(target=submit_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        scheduler.close()
+        for thread in threads:
+            thread.join()
+        # Every accepted submit is answered, none is left waiting
+        done, not_done = concurrent.futures.wait(futures, timeout=5)
+        assert not not_done
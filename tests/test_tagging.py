@@ -0,0 +1,43 @@
+from hazm_methods import parser as p, registry, TAGGER_MODEL
+from pipeline import iter_sentences
+from tagging import CachedPOSTagger, WordFeatureCache
+import os
+import pytest
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'benchmarks', 'corpus.txt')
+
+
+@pytest.fixture(scope='module')
+def taggers():
+    hazm = registry.get('hazm')
+    from hazm.pos_tagger import punctuation_list
+    cache = WordFeatureCache(punctuation_list)
+    return hazm.POSTagger(model=TAGGER_MODEL), CachedPOSTagger(TAGGER_MODEL, cache)
+
+
+def test_matches_hazm_on_corpus(taggers):
+    reference, cached = taggers
+    with open(CORPUS, 'r', encoding='utf-8') as f:
+        sentences = [p.getwordtokens(sentence) for sentence in iter_sentences(f)]
+    assert cached.tag_sents(sentences) == reference.tag_sents(sentences)
+    # Again from a warm feature cache
+    assert cached.tag_sents(sentences) == reference.tag_sents(sentences)
+    assert cached.cache.stats()['hits'] > 0
+
+
+@pytest.mark.parametrize('tokens', [
+    ['سلام'],
+    ['من', '!'],
+    ['او', 'در', 'سال', '۱۴۰۲', 'به', '3', 'شهر', 'رفت', '.'],
+    ['«', 'کتاب', '»', '،', 'را', 'خواندم', '؟'],
+    ['ما', 'ما', 'ما', 'ما'],
+])
+def test_matches_hazm_on_short_and_edge_sentences(taggers, tokens):
+    reference, cached = taggers
+    assert cached.tag(tokens) == reference.tag(tokens)
+
+
+def test_empty_sentence(taggers):
+    _, cached = taggers
+    assert cached.tag([]) == []